@@ -0,0 +1,143 @@
+"""
+Cached admin dashboard statistics
+"""
+
+import os
+import time
+import asyncio
+from typing import Dict, Any, Callable, Awaitable
+from database import (
+    get_users_collection, get_waitlist_collection,
+    get_contact_messages_collection, get_job_applications_collection
+)
+
+# Dashboards poll; every request within this window shares one result
+ADMIN_STATS_TTL_SECONDS = float(os.getenv("ADMIN_STATS_TTL_SECONDS", "5"))
+ADMIN_RECENT_ITEMS = int(os.getenv("ADMIN_RECENT_ITEMS", "5"))
+
+# Stats key -> collection getter
+STATS_COLLECTIONS = {
+    "waitlist": get_waitlist_collection,
+    "contacts": get_contact_messages_collection,
+    "applications": get_job_applications_collection,
+    "users": get_users_collection
+}
+
+# Collections shown in the overview: collection name, sort field, recent item fields
+OVERVIEW_SPECS = {
+    "waitlist": ("waitlist", "joinedAt", ["email", "name", "position", "status"]),
+    "contacts": ("contact_messages", "createdAt", ["name", "email", "status"]),
+    "applications": ("job_applications", "createdAt", ["name", "email", "position", "status"])
+}
+
+class StatsUnavailable(Exception):
+    """Raised when a collection needed for stats is not available"""
+
+class AdminStats:
+    def __init__(self, ttl_seconds: float = ADMIN_STATS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.entries = {}
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def cached(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a fresh cached value, or compute it once for every concurrent caller"""
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        if key in self.in_flight:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            self.in_flight[key] = asyncio.ensure_future(self._refresh(key, compute))
+        # Shielded so one disconnecting client doesn't cancel the shared query
+        return await asyncio.shield(self.in_flight[key])
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            return value
+        finally:
+            self.in_flight.pop(key, None)
+
+    async def counts(self, exact: bool = False) -> Dict[str, int]:
+        """Document counts per collection; estimated from metadata unless exact is set"""
+        return await self.cached("counts:exact" if exact else "counts", lambda: self._counts(exact))
+
+    async def overview(self) -> Dict[str, Any]:
+        """Counts, status breakdowns and recent items in one aggregation"""
+        return await self.cached("overview", self._overview)
+
+    async def _counts(self, exact: bool) -> Dict[str, int]:
+        collections = {key: getter() for key, getter in STATS_COLLECTIONS.items()}
+        if any(collection is None for collection in collections.values()):
+            raise StatsUnavailable("Database not available")
+
+        results = await asyncio.gather(*(
+            collection.count_documents({}) if exact else collection.estimated_document_count()
+            for collection in collections.values()
+        ))
+        return dict(zip(collections, results))
+
+    async def _overview(self) -> Dict[str, Any]:
+        waitlist_collection = get_waitlist_collection()
+        users_collection = get_users_collection()
+        if waitlist_collection is None or users_collection is None:
+            raise StatsUnavailable("Database not available")
+
+        # Tag every document with its source, union the collections and facet once
+        def tagged(key, sort_field, fields):
+            return [{"$project": {"source": {"$literal": key}, "at": f"${sort_field}", **{field: 1 for field in fields}}}]
+
+        pipeline = tagged("waitlist", *OVERVIEW_SPECS["waitlist"][1:])
+        for key in ("contacts", "applications"):
+            collection_name, sort_field, fields = OVERVIEW_SPECS[key]
+            pipeline.append({"$unionWith": {"coll": collection_name, "pipeline": tagged(key, sort_field, fields)}})
+        pipeline.append({"$unionWith": {"coll": "users", "pipeline": [{"$project": {"_id": 1, "source": {"$literal": "users"}}}]}})
+
+        facets = {
+            "counts": [{"$group": {"_id": "$source", "count": {"$sum": 1}}}],
+            "byStatus": [
+                {"$match": {"source": {"$ne": "users"}}},
+                {"$group": {"_id": {"source": "$source", "status": "$status"}, "count": {"$sum": 1}}}
+            ]
+        }
+        for key, (_, _, fields) in OVERVIEW_SPECS.items():
+            facets[f"recent_{key}"] = [
+                {"$match": {"source": key}},
+                {"$sort": {"at": -1, "_id": -1}},
+                {"$limit": ADMIN_RECENT_ITEMS},
+                {"$project": {"source": 0}}
+            ]
+        pipeline.append({"$facet": facets})
+
+        result = (await waitlist_collection.aggregate(pipeline).to_list(length=1))[0]
+
+        counts = {key: 0 for key in STATS_COLLECTIONS}
+        counts.update({entry["_id"]: entry["count"] for entry in result["counts"]})
+        by_status = {key: {} for key in OVERVIEW_SPECS}
+        for entry in result["byStatus"]:
+            by_status[entry["_id"]["source"]][entry["_id"].get("status") or "unknown"] = entry["count"]
+        recent = {}
+        for key in OVERVIEW_SPECS:
+            recent[key] = result[f"recent_{key}"]
+            for item in recent[key]:
+                item["_id"] = str(item["_id"])
+
+        return {"counts": counts, "byStatus": by_status, "recent": recent}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
+
+# Global instance
+admin_stats = AdminStats()
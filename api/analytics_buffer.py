@@ -0,0 +1,167 @@
+"""
+Write-behind buffer for analytics events
+"""
+
+import os
+import asyncio
+from typing import List, Dict, Any
+from pymongo.write_concern import WriteConcern
+from database import get_analytics_collection
+
+# Write-behind configuration
+ANALYTICS_WRITE_BEHIND = os.getenv("ANALYTICS_WRITE_BEHIND", "false").lower() == "true"
+ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", "10000"))
+ANALYTICS_FLUSH_BATCH_SIZE = int(os.getenv("ANALYTICS_FLUSH_BATCH_SIZE", "500"))
+ANALYTICS_FLUSH_INTERVAL_MS = int(os.getenv("ANALYTICS_FLUSH_INTERVAL_MS", "1000"))
+ANALYTICS_WRITE_CONCERN = os.getenv("ANALYTICS_WRITE_CONCERN", "1")
+# "drop" silently discards events when full, "reject" makes the API answer 429
+ANALYTICS_OVERFLOW_POLICY = os.getenv("ANALYTICS_OVERFLOW_POLICY", "drop")
+
+class AnalyticsBufferFull(Exception):
+    """Raised when the buffer is full under the reject overflow policy"""
+
+def parse_write_concern(value: str) -> WriteConcern:
+    """Turn "0", "1", "majority" etc. into a WriteConcern"""
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+class AnalyticsWriteBuffer:
+    def __init__(
+        self,
+        enabled: bool = ANALYTICS_WRITE_BEHIND,
+        max_size: int = ANALYTICS_BUFFER_SIZE,
+        batch_size: int = ANALYTICS_FLUSH_BATCH_SIZE,
+        flush_interval_ms: int = ANALYTICS_FLUSH_INTERVAL_MS,
+        write_concern: str = ANALYTICS_WRITE_CONCERN,
+        overflow_policy: str = ANALYTICS_OVERFLOW_POLICY
+    ):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.write_concern = parse_write_concern(write_concern)
+        self.overflow_policy = overflow_policy
+        self.queue = None
+        self.flusher_task = None
+        self.in_flight = None
+        self.pending = []
+        self.queued = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self.flusher_task is not None and not self.flusher_task.done()
+
+    async def start(self):
+        """Start the background flusher"""
+        if not self.enabled or self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        self.flusher_task = asyncio.create_task(self._flush_loop())
+        print(f"📥 Analytics write-behind enabled (buffer={self.max_size}, batch={self.batch_size}, policy={self.overflow_policy})")
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered"""
+        if not self.running:
+            return
+        self.flusher_task.cancel()
+        try:
+            await self.flusher_task
+        except asyncio.CancelledError:
+            pass
+        self.flusher_task = None
+
+        if self.in_flight is not None and not self.in_flight.done():
+            await self.in_flight
+        batch, self.pending = self.pending, []
+        await self._write_batch(batch)
+        while not self.queue.empty():
+            await self._write_batch(self._drain(self.batch_size))
+        print(f"✅ Analytics buffer flushed on shutdown ({self.flushed} events written)")
+
+    def enqueue_many(self, documents: List[Dict[str, Any]]) -> int:
+        """Buffer documents, returning how many were accepted"""
+        free_slots = self.max_size - self.queue.qsize()
+        if len(documents) > free_slots and self.overflow_policy == "reject":
+            self.rejected += len(documents)
+            raise AnalyticsBufferFull("Analytics buffer is full")
+
+        accepted = 0
+        for document in documents:
+            try:
+                self.queue.put_nowait(document)
+            except asyncio.QueueFull:
+                break
+            accepted += 1
+
+        self.queued += accepted
+        self.dropped += len(documents) - accepted
+        return accepted
+
+    def enqueue(self, document: Dict[str, Any]) -> bool:
+        """Buffer a single document, returning False if it was dropped"""
+        return self.enqueue_many([document]) == 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "depth": self.queue.qsize() if self.queue is not None else 0,
+            "capacity": self.max_size,
+            "queued": self.queued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "overflowPolicy": self.overflow_policy
+        }
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _flush_loop(self):
+        """Flush when a batch fills up or the flush interval elapses"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Events collected so far live on self.pending so stop() can still write them
+            self.pending.append(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self.pending) < self.batch_size:
+                self.pending.extend(self._drain(self.batch_size - len(self.pending)))
+                remaining = deadline - loop.time()
+                if len(self.pending) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    self.pending.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self.pending = self.pending, []
+            # Shield the write so shutdown never abandons a batch mid-insert
+            self.in_flight = asyncio.ensure_future(self._write_batch(batch))
+            await asyncio.shield(self.in_flight)
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        analytics_collection = get_analytics_collection()
+        if analytics_collection is None:
+            self.failed += len(batch)
+            print(f"❌ Analytics collection not available, dropped {len(batch)} buffered events")
+            return
+        try:
+            collection = analytics_collection.with_options(write_concern=self.write_concern)
+            await collection.insert_many(batch, ordered=False)
+            self.flushed += len(batch)
+        except Exception as e:
+            # Analytics is best-effort; log and move on
+            self.failed += len(batch)
+            print(f"❌ Failed to flush {len(batch)} analytics events: {e}")
+
+# Global instance
+analytics_buffer = AnalyticsWriteBuffer()
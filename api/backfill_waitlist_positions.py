@@ -0,0 +1,22 @@
+"""
+One-off backfill: renumber waitlist positions by join order and reset the position counter
+"""
+
+import asyncio
+from database import backfill_waitlist_positions, init_database
+
+async def run_backfill():
+    """Renumber existing waitlist entries"""
+    print("🔢 Backfilling waitlist positions...")
+    
+    try:
+        await init_database()
+        total = await backfill_waitlist_positions()
+        print(f"✅ Renumbered {total} waitlist entries, counter set to {total}")
+        return True
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    asyncio.run(run_backfill())
@@ -0,0 +1,148 @@
+"""
+Benchmark find_one-then-insert vs single insert with DuplicateKeyError under concurrent duplicate submissions
+
+Also compares two register paths that bcrypt-hash on the password pool: hashing before
+the insert, and the lookup register uses to turn away known emails before hashing.
+
+Needs a MongoDB at MONGODB_URL. Documents are written to a throwaway database
+(WRITES_BENCHMARK_DATABASE), never to DATABASE_NAME.
+
+Usage:
+    python benchmark_duplicate_writes.py [requests] [concurrency] [unique_emails] [register_requests]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+from functools import partial
+
+# Must be set before database.py is imported
+os.environ["DATABASE_NAME"] = os.getenv("WRITES_BENCHMARK_DATABASE", "swipr_ai_writes_benchmark")
+
+from pymongo.errors import DuplicateKeyError
+from passlib.context import CryptContext
+from database import get_db
+from password_hashing import PasswordHasherPool
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+async def find_then_insert(collection, email: str) -> str:
+    """The old pattern: two round-trips with a race window between them"""
+    if await collection.find_one({"email": email}):
+        return "duplicate"
+    try:
+        await collection.insert_one({"email": email, "name": "Benchmark"})
+    except DuplicateKeyError:
+        # Lost the race: without the index this would have been a second row, here it is a 500
+        return "raced"
+    return "inserted"
+
+async def insert_only(collection, email: str) -> str:
+    """The new pattern: one round-trip, the unique index decides"""
+    try:
+        await collection.insert_one({"email": email, "name": "Benchmark"})
+    except DuplicateKeyError:
+        return "duplicate"
+    return "inserted"
+
+async def hash_then_insert(hasher: PasswordHasherPool, collection, email: str) -> str:
+    """Register without a pre-check: every duplicate still pays for a bcrypt hash"""
+    password = await hasher.run(pwd_context.hash, "benchmark-password")
+    try:
+        await collection.insert_one({"email": email, "password": password})
+    except DuplicateKeyError:
+        return "duplicate"
+    return "inserted"
+
+async def lookup_hash_insert(hasher: PasswordHasherPool, collection, email: str) -> str:
+    """What register does: one indexed lookup, then hash only unknown emails; the index settles races"""
+    if await collection.find_one({"email": email}, projection={"_id": 1}):
+        return "duplicate"
+    password = await hasher.run(pwd_context.hash, "benchmark-password")
+    try:
+        await collection.insert_one({"email": email, "password": password})
+    except DuplicateKeyError:
+        return "raced"
+    return "inserted"
+
+async def run_pattern(name: str, write, requests: int, concurrency: int, emails):
+    collection = get_db()[f"benchmark_{name}"]
+    await collection.drop()
+    await collection.create_index("email", unique=True)
+
+    latencies = []
+    outcomes = {"inserted": 0, "duplicate": 0, "raced": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def submit(email: str):
+        async with semaphore:
+            started = time.perf_counter()
+            outcome = await write(collection, email)
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(email) for email in emails))
+    elapsed = time.perf_counter() - started
+
+    await collection.drop()
+    return {
+        "pattern": name,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "throughput": requests / elapsed,
+        **outcomes
+    }
+
+async def run_register_patterns(requests: int, concurrency: int, emails):
+    """Both register paths on their own hashing pool; also reports how many hashes each ran"""
+    results = []
+    for name, write in [("hash_then_insert", hash_then_insert), ("lookup_hash_insert", lookup_hash_insert)]:
+        # Queue deep enough that the pool never sheds load mid-benchmark
+        hasher = PasswordHasherPool(max_queue=concurrency)
+        try:
+            result = await run_pattern(name, partial(write, hasher), requests, concurrency, emails)
+        finally:
+            hasher.shutdown()
+        results.append({**result, "hashes": hasher.completed})
+    return results
+
+async def run_benchmark(requests: int, concurrency: int, unique_emails: int, register_requests: int = 0):
+    print(f"⏱️ {requests} submissions, {concurrency} concurrent, {unique_emails} distinct emails...")
+    # Every email is submitted several times, shuffled so duplicates overlap in flight
+    emails = [f"user{i % unique_emails}@example.com" for i in range(requests)]
+    random.shuffle(emails)
+
+    results = []
+    try:
+        for name, write in [("find_then_insert", find_then_insert), ("insert_only", insert_only)]:
+            results.append(await run_pattern(name, write, requests, concurrency, emails))
+        if register_requests:
+            print(f"⏱️ Register paths: {register_requests} submissions with bcrypt hashing...")
+            results += await run_register_patterns(register_requests, concurrency, emails[:register_requests])
+    finally:
+        await get_db().client.drop_database(os.environ["DATABASE_NAME"])
+
+    print()
+    print(f"{'pattern':<18} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'inserted':>9} {'duplicate':>10} {'raced':>6} {'hashes':>7}")
+    for r in results:
+        print(
+            f"{r['pattern']:<18} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['throughput']:>8.0f} "
+            f"{r['inserted']:>9} {r['duplicate']:>10} {r['raced']:>6} {r.get('hashes', '-'):>7}"
+        )
+    return results
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    requests = args[0] if len(args) > 0 else 20000
+    concurrency = args[1] if len(args) > 1 else 200
+    unique_emails = args[2] if len(args) > 2 else requests // 4
+    # bcrypt makes the register paths far slower, so they run on a prefix of the submissions
+    register_requests = args[3] if len(args) > 3 else min(requests, 1000)
+    asyncio.run(run_benchmark(requests, concurrency, unique_emails, register_requests))
@@ -0,0 +1,100 @@
+"""
+Benchmark price fan-out to many concurrent subscribers on one event loop
+
+Usage: python benchmark_price_stream.py [subscribers] [seconds]
+Runs in-process (no sockets) so it measures the hub: encode, fan-out and queueing.
+"""
+
+import sys
+import time
+import asyncio
+import resource
+import numpy as np
+from market_data import MarketDataStore, DEFAULT_UNIVERSE
+from price_stream import PriceHub, SimulatedTickSource
+from metrics import summarize
+
+UNIVERSE_SIZE = 2000
+POPULAR_SYMBOLS = 50
+SYMBOLS_PER_CLIENT = 5
+# Most clients use one of the app's preset watchlists; the rest build their own
+PRESET_WATCHLISTS = 100
+PRESET_FRACTION = 0.8
+TICK_INTERVAL_MS = 100
+SLOW_CLIENT_FRACTION = 0.05
+SLOW_CLIENT_DELAY_SECONDS = 0.5
+
+def build_store() -> MarketDataStore:
+    store = MarketDataStore(DEFAULT_UNIVERSE)
+    rng = np.random.default_rng(1)
+    store.add_symbols({
+        f"SYM{i:04d}": {"price": float(rng.uniform(5, 500)), "change": 0.0, "volume": 1000000, "marketCap": "10B"}
+        for i in range(UNIVERSE_SIZE - len(store))
+    })
+    return store
+
+async def consume(subscription, slow: bool, counters):
+    while True:
+        await subscription.next_message()
+        counters["delivered"] += 1
+        if slow:
+            await asyncio.sleep(SLOW_CLIENT_DELAY_SECONDS)
+
+async def measure_loop_lag(samples, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while True:
+        started_at = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - started_at - interval)
+
+async def run_benchmark(subscribers: int, seconds: float):
+    store = build_store()
+    hub = PriceHub(store)
+    source = SimulatedTickSource(hub, interval_ms=TICK_INTERVAL_MS, fraction=0.05, seed=7)
+    rng = np.random.default_rng(3)
+
+    popular = store.symbols[:POPULAR_SYMBOLS]
+    presets = [list(rng.choice(popular, size=SYMBOLS_PER_CLIENT, replace=False)) for _ in range(PRESET_WATCHLISTS)]
+    counters = {"delivered": 0}
+    subscribe_started = time.perf_counter()
+    consumers = []
+    for _ in range(subscribers):
+        if rng.random() < PRESET_FRACTION:
+            symbols = presets[rng.integers(len(presets))]
+        else:
+            symbols = list(rng.choice(popular, size=SYMBOLS_PER_CLIENT, replace=False))
+        subscription = hub.subscribe(symbols if rng.random() > 0.01 else None)
+        slow = rng.random() < SLOW_CLIENT_FRACTION
+        consumers.append(asyncio.create_task(consume(subscription, slow, counters)))
+    subscribe_seconds = time.perf_counter() - subscribe_started
+
+    publish_times, loop_lag = [], []
+    lag_task = asyncio.create_task(measure_loop_lag(loop_lag))
+    counters["delivered"] = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < seconds:
+        await asyncio.sleep(source.interval)
+        tick_started = time.perf_counter()
+        source.tick()
+        publish_times.append(time.perf_counter() - tick_started)
+    elapsed = time.perf_counter() - started_at
+
+    stats = hub.stats()
+    for task in consumers + [lag_task]:
+        task.cancel()
+    await asyncio.gather(*consumers, lag_task, return_exceptions=True)
+
+    print(f"\n📊 {subscribers} subscribers, {stats['groups']} groups, {len(store)} symbols, {seconds:.0f}s")
+    print(f"  subscribe:        {subscribe_seconds * 1000:.0f}ms total")
+    print(f"  ticks:            {stats['ticks']} ({1000 / TICK_INTERVAL_MS:.0f}/s)")
+    print(f"  tick + fan-out:   {summarize(publish_times)}")
+    print(f"  encodes:          {stats['messagesEncoded']} (vs {stats['messagesOffered']} messages queued)")
+    print(f"  delivered:        {counters['delivered'] / elapsed:,.0f} msgs/s")
+    print(f"  dropped (slow):   {stats['dropped']}")
+    print(f"  event loop lag:   {summarize(loop_lag)}")
+    print(f"  peak RSS:         {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+if __name__ == "__main__":
+    subscriber_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run_benchmark(subscriber_count, duration))
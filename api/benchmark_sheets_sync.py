@@ -0,0 +1,135 @@
+"""
+Benchmark Google Sheets sync throughput (rows/sec) against the local fake Sheets server
+
+Needs a MongoDB at MONGODB_URL. Documents are written to a throwaway database
+(SHEETS_BENCHMARK_DATABASE), never to DATABASE_NAME.
+
+Usage:
+    python benchmark_sheets_sync.py [sizes...]       # default: 1000 10000 100000
+    FAKE_SHEETS_LATENCY_MS=150 python benchmark_sheets_sync.py 10000
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import threading
+
+# Must be set before database.py is imported
+os.environ["DATABASE_NAME"] = os.getenv("SHEETS_BENCHMARK_DATABASE", "swipr_ai_sheets_benchmark")
+
+import uvicorn
+from database import (
+    get_db,
+    get_waitlist_collection,
+    get_contact_messages_collection,
+    get_job_applications_collection
+)
+from sheets_client import AsyncSheetsClient, SheetsRequestScheduler
+from sheets_integration import GoogleSheetsManager
+from fake_sheets_server import create_app
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEED_BATCH_SIZE = 10000
+
+def start_fake_server():
+    """Run the fake Sheets API on a free port in a background thread"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    fake_app = create_app()
+    server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, fake_app, f"http://127.0.0.1:{port}"
+
+async def seed(collection, count: int, make_document):
+    for start in range(0, count, SEED_BATCH_SIZE):
+        batch = [make_document(i) for i in range(start, min(start + SEED_BATCH_SIZE, count))]
+        await collection.insert_many(batch, ordered=False)
+
+async def seed_collections(waitlist_count: int, offset: int = 0):
+    """Waitlist gets the full count; contacts and applications a tenth each"""
+    timestamp = "2025-01-01T00:00:00"
+    await seed(get_waitlist_collection(), waitlist_count, lambda i: {
+        "email": f"user{offset + i}@example.com", "name": f"User {offset + i}",
+        "interests": ["stocks", "crypto"], "position": offset + i + 1,
+        "joinedAt": timestamp, "referrals": 0, "status": "active"
+    })
+    await seed(get_contact_messages_collection(), waitlist_count // 10, lambda i: {
+        "name": f"Contact {offset + i}", "email": f"contact{offset + i}@example.com",
+        "message": "Hello from the benchmark", "status": "new", "createdAt": timestamp
+    })
+    await seed(get_job_applications_collection(), waitlist_count // 10, lambda i: {
+        "position": "Engineer", "name": f"Applicant {offset + i}", "email": f"applicant{offset + i}@example.com",
+        "phone": "555-0100", "coverLetter": "Benchmark cover letter", "resumeUrl": "",
+        "status": "new", "createdAt": timestamp
+    })
+    return waitlist_count + 2 * (waitlist_count // 10)
+
+async def run_size(size: int, fake_app, base_url: str):
+    db = get_db()
+    for name in ["waitlist", "contact_messages", "job_applications", "sheets_sync_state"]:
+        await db[name].drop()
+
+    rows = await seed_collections(size)
+
+    manager = GoogleSheetsManager()
+    # Effectively unlimited quota: we are measuring our own overhead, not Google's throttling
+    manager.client = AsyncSheetsClient(base_url=base_url, scheduler=SheetsRequestScheduler(requests_per_minute=10 ** 7))
+    await manager.create_spreadsheet(f"Benchmark {size}")
+
+    requests_before = fake_app.state.sheets.counters["requests"]
+    started = time.perf_counter()
+    success = await manager.sync_all_data(incremental=False)
+    full_seconds = time.perf_counter() - started
+    full_requests = fake_app.state.sheets.counters["requests"] - requests_before
+
+    # Then an incremental pass over 1% new documents
+    new_rows = await seed_collections(max(size // 100, 10), offset=size)
+    requests_before = fake_app.state.sheets.counters["requests"]
+    started = time.perf_counter()
+    success &= await manager.sync_all_data()
+    incremental_seconds = time.perf_counter() - started
+    incremental_requests = fake_app.state.sheets.counters["requests"] - requests_before
+
+    await manager.close()
+    return {
+        "size": size,
+        "success": success,
+        "rows": rows,
+        "fullSeconds": full_seconds,
+        "fullRequests": full_requests,
+        "newRows": new_rows,
+        "incrementalSeconds": incremental_seconds,
+        "incrementalRequests": incremental_requests
+    }
+
+async def run_benchmark(sizes):
+    print("⏱️ Benchmarking Google Sheets sync against the fake Sheets API...")
+    server, fake_app, base_url = start_fake_server()
+    print(f"📊 Fake Sheets API at {base_url} (latency {fake_app.state.sheets.latency_ms}ms)")
+
+    results = []
+    try:
+        for size in sizes:
+            results.append(await run_size(size, fake_app, base_url))
+    finally:
+        server.should_exit = True
+        await get_db().client.drop_database(os.environ["DATABASE_NAME"])
+
+    print()
+    print(f"{'waitlist':>10} {'rows':>8} {'full s':>8} {'rows/s':>10} {'reqs':>5} {'new':>6} {'incr s':>8} {'rows/s':>10} {'reqs':>5}")
+    for r in results:
+        print(
+            f"{r['size']:>10} {r['rows']:>8} {r['fullSeconds']:>8.2f} {r['rows'] / r['fullSeconds']:>10.0f} {r['fullRequests']:>5} "
+            f"{r['newRows']:>6} {r['incrementalSeconds']:>8.2f} {r['newRows'] / r['incrementalSeconds']:>10.0f} {r['incrementalRequests']:>5}"
+            + ("" if r['success'] else "  ❌ sync failed")
+        )
+    return all(r['success'] for r in results)
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    asyncio.run(run_benchmark(sizes))
@@ -0,0 +1,11 @@
+"""
+Flatten document values into the text cells used by Google Sheets and CSV exports
+"""
+
+def format_cell(value) -> str:
+    """None -> '', lists -> comma-separated, anything else -> str"""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return value if isinstance(value, str) else str(value)
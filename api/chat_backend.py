@@ -0,0 +1,163 @@
+"""
+Pluggable chat response backends with a shared response cache
+"""
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+import importlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Dict, Any, List, Optional
+from metrics import summarize, METRICS_WINDOW
+
+# "local" or "package.module:ClassName" for a custom backend
+CHAT_BACKEND = os.getenv("CHAT_BACKEND", "local")
+CHAT_LOCAL_TOKEN_DELAY_MS = int(os.getenv("CHAT_LOCAL_TOKEN_DELAY_MS", "0"))
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1000"))
+CHAT_CACHE_TTL_SECONDS = int(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600"))
+# How many recent messages count as context in the cache key
+CHAT_CACHE_CONTEXT_MESSAGES = int(os.getenv("CHAT_CACHE_CONTEXT_MESSAGES", "2"))
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", message).strip().lower().rstrip("?!. ")
+
+class ChatBackend(ABC):
+    """Interface for chat backends: yield the reply a token at a time"""
+
+    name = "base"
+
+    @abstractmethod
+    def stream(self, message: str, context: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Implement as an async generator"""
+
+class LocalChatBackend(ChatBackend):
+    """Deterministic stand-in: the same message always gets the same reply"""
+
+    name = "local"
+    responses = [
+        "That's an interesting question about investing!",
+        "I'd be happy to help you with your investment strategy.",
+        "Let me analyze that for you...",
+        "Based on current market conditions...",
+        "Here's what I think about that..."
+    ]
+
+    def __init__(self, token_delay_ms: int = CHAT_LOCAL_TOKEN_DELAY_MS):
+        self.token_delay = token_delay_ms / 1000
+
+    def reply(self, message: str) -> str:
+        # Python's hash() is salted per process, so use a stable digest
+        digest = hashlib.sha256(normalize_message(message).encode()).digest()
+        return self.responses[int.from_bytes(digest[:4], "big") % len(self.responses)]
+
+    async def stream(self, message: str, context: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        words = self.reply(message).split(" ")
+        for index, word in enumerate(words):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if index == 0 else " " + word
+
+CHAT_BACKENDS = {
+    "local": LocalChatBackend
+}
+
+def load_backend(name: str = CHAT_BACKEND) -> ChatBackend:
+    """Build a backend from the registry or a "module:Class" path"""
+    if name in CHAT_BACKENDS:
+        return CHAT_BACKENDS[name]()
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown chat backend: {name}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+class ChatResponseCache:
+    """LRU of complete replies keyed on the normalized message plus recent context"""
+
+    def __init__(self, max_size: int = CHAT_CACHE_SIZE, ttl_seconds: int = CHAT_CACHE_TTL_SECONDS, context_messages: int = CHAT_CACHE_CONTEXT_MESSAGES):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.context_messages = context_messages
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, backend_name: str, message: str, context: List[Dict[str, Any]]) -> str:
+        recent = context[-self.context_messages:] if self.context_messages else []
+        parts = [backend_name, normalize_message(message)]
+        parts.extend(f"{entry.get('role')}:{normalize_message(entry.get('content', ''))}" for entry in recent)
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, response: str):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+class ChatResponder:
+    """Front door for chat replies: cache first, then the configured backend"""
+
+    def __init__(self, backend: ChatBackend = None, cache: ChatResponseCache = None):
+        self.backend = backend
+        self.cache = cache or ChatResponseCache()
+        self.time_to_first_token = deque(maxlen=METRICS_WINDOW)
+
+    def get_backend(self) -> ChatBackend:
+        if self.backend is None:
+            self.backend = load_backend()
+        return self.backend
+
+    async def stream(self, message: str, context: List[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {"token": ...} chunks and finally {"response": ..., "cached": bool}"""
+        context = context or []
+        backend = self.get_backend()
+        key = self.cache.key(backend.name, message, context)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield {"token": cached}
+            yield {"response": cached, "cached": True}
+            return
+
+        started_at = time.perf_counter()
+        tokens = []
+        async for token in backend.stream(message, context):
+            if not tokens:
+                self.time_to_first_token.append(time.perf_counter() - started_at)
+            tokens.append(token)
+            yield {"token": token}
+
+        response = "".join(tokens)
+        self.cache.put(key, response)
+        yield {"response": response, "cached": False}
+
+    async def complete(self, message: str, context: List[Dict[str, Any]] = None) -> str:
+        async for chunk in self.stream(message, context):
+            if "response" in chunk:
+                return chunk["response"]
+        return ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.get_backend().name,
+            "cacheHits": self.cache.hits,
+            "cacheMisses": self.cache.misses,
+            "cached": len(self.cache.entries),
+            "timeToFirstToken": summarize(self.time_to_first_token)
+        }
+
+# Global instance
+chat_responder = ChatResponder()
@@ -0,0 +1,146 @@
+"""
+Chat history stored as fixed-size message buckets plus a capped recent-context window
+"""
+
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from pymongo import ReturnDocument, UpdateOne
+from database import get_chat_sessions_collection, get_chat_messages_collection
+
+CHAT_BUCKET_SIZE = int(os.getenv("CHAT_BUCKET_SIZE", "50"))
+CHAT_CONTEXT_WINDOW = int(os.getenv("CHAT_CONTEXT_WINDOW", "20"))
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "50"))
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_MAX_PAGE_SIZE", "200"))
+
+class ChatHistoryUnavailable(Exception):
+    """Raised when the chat collections are not available"""
+
+class ChatHistoryStore:
+    """Session docs hold a counter and the last few messages; full history lives in buckets
+
+    Message seq numbers start at 0, and message `seq` lives in bucket
+    `seq // bucket_size`, so each append touches one small session doc
+    and one bounded bucket no matter how long the session gets.
+    """
+
+    def __init__(self, bucket_size: int = CHAT_BUCKET_SIZE, context_window: int = CHAT_CONTEXT_WINDOW):
+        self.bucket_size = bucket_size
+        self.context_window = context_window
+
+    def _collections(self):
+        sessions_collection = get_chat_sessions_collection()
+        messages_collection = get_chat_messages_collection()
+        if sessions_collection is None or messages_collection is None:
+            raise ChatHistoryUnavailable("Database not available")
+        return sessions_collection, messages_collection
+
+    async def recent_context(self, session_id: str) -> List[Dict[str, Any]]:
+        """The capped window of recent messages, oldest first"""
+        sessions_collection, _ = self._collections()
+        session = await sessions_collection.find_one({"id": session_id}, projection={"recent": 1})
+        return session.get("recent", []) if session else []
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Append messages to a session (creating it if needed), returning the new message count"""
+        sessions_collection, messages_collection = self._collections()
+        now = datetime.utcnow().isoformat()
+
+        # Reserve seq numbers and roll the context window in one atomic update
+        session = await sessions_collection.find_one_and_update(
+            {"id": session_id},
+            {
+                "$inc": {"messageCount": len(messages)},
+                "$push": {"recent": {"$each": messages, "$slice": -self.context_window}},
+                "$set": {"updatedAt": now},
+                "$setOnInsert": {"createdAt": now}
+            },
+            projection={"messageCount": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        message_count = session["messageCount"]
+        first_seq = message_count - len(messages)
+
+        buckets = {}
+        for offset, message in enumerate(messages):
+            seq = first_seq + offset
+            buckets.setdefault(seq // self.bucket_size, []).append({**message, "seq": seq})
+
+        operations = [
+            UpdateOne(
+                {"sessionId": session_id, "bucket": bucket},
+                {
+                    "$push": {"messages": {"$each": bucket_messages}},
+                    "$inc": {"count": len(bucket_messages)},
+                    "$setOnInsert": {"createdAt": now}
+                },
+                upsert=True
+            )
+            for bucket, bucket_messages in buckets.items()
+        ]
+        await messages_collection.bulk_write(operations, ordered=False)
+        return message_count
+
+    async def history(self, session_id: str, before: Optional[int] = None, limit: int = CHAT_HISTORY_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """A page of messages older than `before` (newest page by default), oldest first"""
+        sessions_collection, messages_collection = self._collections()
+        session = await sessions_collection.find_one({"id": session_id}, projection={"messageCount": 1})
+        if session is None:
+            return None
+
+        limit = max(1, min(limit, CHAT_HISTORY_MAX_PAGE_SIZE))
+        message_count = session.get("messageCount", 0)
+        end = message_count if before is None else max(0, min(before, message_count))
+        start = max(0, end - limit)
+        if start == end:
+            return {"messages": [], "next": None, "total": message_count}
+
+        # Only the buckets overlapping [start, end) are read
+        cursor = messages_collection.find({
+            "sessionId": session_id,
+            "bucket": {"$gte": start // self.bucket_size, "$lte": (end - 1) // self.bucket_size}
+        }, projection={"messages": 1})
+        page = []
+        async for bucket in cursor:
+            page.extend(message for message in bucket["messages"] if start <= message["seq"] < end)
+        # Concurrent appends may land in a bucket out of order
+        page.sort(key=lambda message: message["seq"])
+
+        return {"messages": page, "next": start if start > 0 else None, "total": message_count}
+
+    async def migrate_legacy_session(self, session: Dict[str, Any]) -> int:
+        """Move an old unbounded `messages` array into buckets"""
+        sessions_collection, messages_collection = self._collections()
+        legacy_messages = session.get("messages") or []
+        now = datetime.utcnow().isoformat()
+
+        operations = []
+        for bucket_start in range(0, len(legacy_messages), self.bucket_size):
+            bucket_messages = [
+                {**message, "seq": bucket_start + offset}
+                for offset, message in enumerate(legacy_messages[bucket_start:bucket_start + self.bucket_size])
+            ]
+            operations.append(UpdateOne(
+                {"sessionId": session["id"], "bucket": bucket_start // self.bucket_size},
+                {"$set": {"messages": bucket_messages, "count": len(bucket_messages), "createdAt": now}},
+                upsert=True
+            ))
+        if operations:
+            await messages_collection.bulk_write(operations, ordered=False)
+
+        await sessions_collection.update_one(
+            {"_id": session["_id"]},
+            {
+                "$set": {
+                    "messageCount": len(legacy_messages),
+                    "recent": legacy_messages[-self.context_window:],
+                    "updatedAt": now
+                },
+                "$unset": {"messages": ""}
+            }
+        )
+        return len(legacy_messages)
+
+# Global instance
+chat_history = ChatHistoryStore()
@@ -0,0 +1,74 @@
+"""
+Check that every hot query in main.py is served by an index (no COLLSCAN)
+
+Usage: python check_indexes.py [--apply]
+  --apply  re-apply INDEX_SPECS before checking
+"""
+
+import sys
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from database import get_db, create_indexes
+
+def keyset_filter(sort_field):
+    """Filter fetch_page() uses for every page after the first"""
+    value = datetime.utcnow().isoformat()
+    return {sort_field: {"$lte": value}, "$or": [{sort_field: {"$lt": value}}, {"_id": {"$lt": ObjectId()}}]}
+
+# (description, collection, filter, sort) for the queries the API runs on every request
+HOT_QUERIES = [
+    ("login: user by email", "users", {"email": "check@example.com"}, None),
+    ("startup: highest waitlist position", "waitlist", {}, [("position", -1)]),
+    ("admin: waitlist page", "waitlist", keyset_filter("joinedAt"), [("joinedAt", -1), ("_id", -1)]),
+    ("admin: contact messages page", "contact_messages", keyset_filter("createdAt"), [("createdAt", -1), ("_id", -1)]),
+    ("admin: job applications page", "job_applications", keyset_filter("createdAt"), [("createdAt", -1), ("_id", -1)]),
+    ("social: unfollow", "follows", {"followerId": "check", "targetUserId": "check"}, None),
+    ("chat: session by id", "chat_sessions", {"id": "check"}, None),
+    ("chat: append to history bucket", "chat_messages", {"sessionId": "check", "bucket": 0}, None),
+    ("chat: history page", "chat_messages", {"sessionId": "check", "bucket": {"$gte": 0, "$lte": 1}}, None),
+    ("sheets: incremental waitlist sync", "waitlist", {"_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+    ("idempotency: key lookup", "idempotency_keys", {"_id": "check"}, None)
+]
+
+def plan_stages(plan):
+    """Yield every stage name in an explain plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+async def explain_query(collection_name, query_filter, sort):
+    cursor = get_db()[collection_name].find(query_filter)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.limit(1).explain()
+    return list(plan_stages(explanation["queryPlanner"]["winningPlan"]))
+
+async def check_indexes(apply: bool = False) -> bool:
+    """Explain every hot query, returning False if any does a collection scan"""
+    if get_db() is None:
+        print("❌ Database not available")
+        return False
+
+    if apply:
+        updated = await create_indexes(force=True)
+        print(f"🔧 Applied indexes for: {', '.join(updated) or 'nothing'}")
+
+    ok = True
+    for description, collection_name, query_filter, sort in HOT_QUERIES:
+        stages = await explain_query(collection_name, query_filter, sort)
+        if "COLLSCAN" in stages:
+            ok = False
+            print(f"❌ {description} ({collection_name}): COLLSCAN [{' > '.join(stages)}]")
+        else:
+            print(f"✅ {description} ({collection_name}): {' > '.join(stages)}")
+    return ok
+
+if __name__ == "__main__":
+    passed = asyncio.run(check_indexes(apply="--apply" in sys.argv))
+    sys.exit(0 if passed else 1)
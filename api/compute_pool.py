@@ -0,0 +1,248 @@
+"""
+Warm process pool for CPU-heavy portfolio work, kept off the event loop
+"""
+
+import os
+import time
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Awaitable
+from monte_carlo import simulate_allocation
+from portfolio_optimizer import portfolio_optimizer
+from metrics import summarize, METRICS_WINDOW
+
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+COMPUTE_MAX_QUEUE = int(os.getenv("COMPUTE_MAX_QUEUE", "16"))
+COMPUTE_TIMEOUT_SECONDS = float(os.getenv("COMPUTE_TIMEOUT_SECONDS", "10"))
+COMPUTE_UTILIZATION_WINDOW_SECONDS = 60
+
+class ComputePoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+class ComputeDeadlineExceeded(Exception):
+    """Raised when a job runs past its deadline"""
+
+class ComputeCancelled(Exception):
+    """Raised when a job is cancelled, e.g. because the client disconnected"""
+
+# ---- Worker side (runs in the pool's processes) ----
+# Workers keep the market data they loaded at startup. The risk model doesn't
+# depend on prices, so jobs never need the latest ticks; live prices in results
+# are filled in by the caller.
+
+_cancel_flags = None
+_current_job = None
+
+def _initialize_worker(cancel_flags):
+    """Preload NumPy, market data and both portfolio paths so the first real job is warm"""
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+    portfolio_optimizer.frontier()
+    simulate_allocation({"stocks": 1.0}, 12, 10000, paths=100, seed=0)
+
+def _warm_up() -> int:
+    return os.getpid()
+
+def checkpoint():
+    """Called by jobs between chunks of work; abandons the job once cancelled or past its deadline"""
+    slot, deadline = _current_job
+    if _cancel_flags[slot]:
+        raise ComputeCancelled("Job cancelled")
+    if time.time() > deadline:
+        raise ComputeDeadlineExceeded("Job deadline exceeded")
+
+def _run_job(slot: int, deadline: float, fn: Callable[..., Any], args):
+    global _current_job
+    started_at = time.time()
+    _current_job = (slot, deadline)
+    try:
+        checkpoint()
+        return True, fn(*args), started_at, time.time()
+    except Exception as e:
+        return False, e, started_at, time.time()
+
+def optimize_portfolio_job(risk_level: str, amount: float, preferences: Dict) -> Dict[str, Any]:
+    return portfolio_optimizer.optimize(risk_level, amount, preferences, checkpoint=checkpoint)
+
+def simulate_portfolio_job(allocation: Dict[str, float], months: int, initial_value: float, paths: int, seed: Optional[int]) -> Dict[str, Any]:
+    return simulate_allocation(allocation, months, initial_value, paths, seed, checkpoint=checkpoint)
+
+# ---- Event loop side ----
+
+class ComputePool:
+    def __init__(self, workers: int = COMPUTE_WORKERS, max_queue: int = COMPUTE_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        # Spawned (not forked) workers don't inherit the event loop or the database client
+        self.context = multiprocessing.get_context("spawn")
+        # One cancel flag per in-flight slot, shared with every worker
+        self.cancel_flags = self.context.RawArray("b", workers + max_queue)
+        self.free_slots = list(range(workers + max_queue))
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        # Rolling windows of recent samples, in seconds
+        self.run_times = deque(maxlen=METRICS_WINDOW)
+        self.queue_waits = deque(maxlen=METRICS_WINDOW)
+        # (finished_at, busy seconds) for the utilization window
+        self.recent_busy = deque()
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self.context,
+                initializer=_initialize_worker,
+                initargs=(self.cancel_flags,)
+            )
+
+    async def warm(self):
+        """Start every worker and wait until each has preloaded"""
+        self.start()
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up) for _ in range(self.workers)))
+        print(f"🧮 Compute pool ready: {len(set(pids))} workers in {(time.perf_counter() - started_at) * 1000:.0f}ms")
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        timeout: float = COMPUTE_TIMEOUT_SECONDS,
+        disconnected: Optional[Awaitable] = None
+    ) -> Any:
+        """Run fn(*args) on a worker, or fail fast if the pool is saturated
+
+        fn must be a module-level function. Raises ComputeDeadlineExceeded after
+        `timeout` seconds and ComputeCancelled if `disconnected` completes first;
+        either way the worker abandons the job at its next checkpoint.
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            if disconnected is not None:
+                disconnected.close()
+            raise ComputePoolSaturated("Compute pool is saturated")
+        self.start()
+
+        slot = self.free_slots.pop()
+        submitted_at = time.time()
+        deadline = submitted_at + timeout
+        executor = self.executor
+        try:
+            future = asyncio.wrap_future(
+                executor.submit(_run_job, slot, deadline, fn, args)
+            )
+        except BrokenProcessPool:
+            self.free_slots.append(slot)
+            self._restart(executor)
+            if disconnected is not None:
+                disconnected.close()
+            raise ComputePoolSaturated("Compute pool is restarting")
+        self.in_flight += 1
+        # The slot stays taken until the worker is really done with it
+        future.add_done_callback(lambda done: self._finish(slot, submitted_at, done))
+
+        watcher = asyncio.ensure_future(disconnected) if disconnected is not None else None
+        try:
+            await asyncio.wait({future, watcher} - {None}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not future.done():
+                self.cancel_flags[slot] = 1
+                if watcher is not None and watcher.done():
+                    self.cancelled += 1
+                    raise ComputeCancelled("Client disconnected")
+                self.timed_out += 1
+                raise ComputeDeadlineExceeded("Job deadline exceeded")
+        except asyncio.CancelledError:
+            self.cancel_flags[slot] = 1
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+        try:
+            ok, value, _, _ = future.result()
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise ComputePoolSaturated("Compute pool is restarting")
+        if not ok:
+            if isinstance(value, ComputeDeadlineExceeded):
+                self.timed_out += 1
+            elif isinstance(value, ComputeCancelled):
+                self.cancelled += 1
+            raise value
+        return value
+
+    def _finish(self, slot: int, submitted_at: float, future: asyncio.Future):
+        self.cancel_flags[slot] = 0
+        self.free_slots.append(slot)
+        self.in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            return
+
+        ok, value, started_at, finished_at = future.result()
+        busy = finished_at - started_at
+        self.busy_seconds += busy
+        self.recent_busy.append((finished_at, busy))
+        self.run_times.append(busy)
+        self.queue_waits.append(max(0.0, started_at - submitted_at))
+        # Deadlines and cancellations are counted where the caller gives up
+        if ok:
+            self.completed += 1
+        elif not isinstance(value, (ComputeDeadlineExceeded, ComputeCancelled)):
+            self.failed += 1
+
+    def _restart(self, broken_executor: ProcessPoolExecutor):
+        # A worker died (e.g. killed for memory); replace the whole pool on next use.
+        # Jobs from the old pool keep failing after it was replaced; they must not take the new one down.
+        if self.executor is broken_executor and broken_executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.restarts += 1
+            print("⚠️ Compute pool broken, restarting workers")
+
+    def utilization(self, window: float = COMPUTE_UTILIZATION_WINDOW_SECONDS) -> float:
+        """Fraction of worker time spent on jobs over the last `window` seconds"""
+        now = time.time()
+        while self.recent_busy and self.recent_busy[0][0] < now - window:
+            self.recent_busy.popleft()
+        span = min(window, now - self.started_at)
+        if span <= 0:
+            return 0.0
+        return min(1.0, sum(busy for _, busy in self.recent_busy) / (span * self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "queueDepth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+            "cancelled": self.cancelled,
+            "restarts": self.restarts,
+            "utilization": round(self.utilization(), 3),
+            "lifetimeUtilization": round(self.busy_seconds / max(time.time() - self.started_at, 1e-9) / self.workers, 3),
+            "runTime": summarize(self.run_times),
+            "queueWait": summarize(self.queue_waits)
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+# Global instance
+compute_pool = ComputePool()
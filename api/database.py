@@ -3,9 +3,14 @@ Database models and connection for swipr.ai
 """
 
 import os
+import json
+import asyncio
+import hashlib
 from datetime import datetime
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from bson import ObjectId
 
@@ -19,6 +24,8 @@ except ImportError:
 # MongoDB connection
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "swipr_ai")
+# How long stored Idempotency-Key responses are kept
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
 
 print(f"🔗 Using MongoDB URL: {MONGODB_URL}")
 
@@ -79,6 +86,70 @@ def get_follows_collection():
 def get_chat_sessions_collection():
     return get_collection("chat_sessions")
 
+def get_chat_messages_collection():
+    return get_collection("chat_messages")
+
+def get_counters_collection():
+    return get_collection("counters")
+
+def get_sheets_sync_state_collection():
+    return get_collection("sheets_sync_state")
+
+def get_idempotency_keys_collection():
+    return get_collection("idempotency_keys")
+
+def get_index_versions_collection():
+    return get_collection("index_versions")
+
+# Counter names
+WAITLIST_POSITION_COUNTER = "waitlist_position"
+
+# Index specs per collection. create_indexes() re-applies a collection's
+# indexes only when its spec changes; run check_indexes.py after editing.
+# Indexes marked "required" must apply or startup fails (signups rely on their
+# DuplicateKeyError); the rest are applied best-effort and retried next start.
+INDEX_SPECS = {
+    "users": [
+        {"keys": [("email", 1)], "unique": True, "required": True}
+    ],
+    "waitlist": [
+        {"keys": [("email", 1)], "unique": True, "required": True},
+        {"keys": [("position", 1)]},
+        {"keys": [("joinedAt", 1), ("_id", 1)]}
+    ],
+    "contact_messages": [
+        {"keys": [("email", 1)]},
+        {"keys": [("createdAt", 1), ("_id", 1)]}
+    ],
+    "job_applications": [
+        {"keys": [("email", 1)]},
+        {"keys": [("position", 1)]},
+        {"keys": [("createdAt", 1), ("_id", 1)]}
+    ],
+    "analytics": [
+        {"keys": [("timestamp", 1)]},
+        {"keys": [("eventType", 1)]}
+    ],
+    "follows": [
+        {"keys": [("followerId", 1), ("targetUserId", 1)], "unique": True}
+    ],
+    "chat_sessions": [
+        {"keys": [("id", 1)], "unique": True}
+    ],
+    "chat_messages": [
+        {"keys": [("sessionId", 1), ("bucket", 1)], "unique": True}
+    ],
+    "idempotency_keys": [
+        {"keys": [("createdAt", 1)], "expireAfterSeconds": IDEMPOTENCY_KEY_TTL_SECONDS}
+    ]
+}
+
+# MongoDB error code for an existing index with different options
+INDEX_OPTIONS_CONFLICT = 85
+
+class RequiredIndexError(Exception):
+    """Raised when an index marked "required" could not be applied"""
+
 # Pydantic models for database documents
 class PyObjectId(ObjectId):
     @classmethod
@@ -172,40 +243,147 @@ async def get_collection_count(collection):
         return 0
     return await collection.count_documents({})
 
-async def create_indexes():
-    """Create indexes for better performance"""
-    try:
-        # Users collection
-        users_collection = get_users_collection()
-        if users_collection is not None:
-            await users_collection.create_index("email", unique=True)
-        
-        # Waitlist collection
-        waitlist_collection = get_waitlist_collection()
-        if waitlist_collection is not None:
-            await waitlist_collection.create_index("email", unique=True)
-        
-        # Contact messages collection
-        contact_messages_collection = get_contact_messages_collection()
-        if contact_messages_collection is not None:
-            await contact_messages_collection.create_index("email")
-            await contact_messages_collection.create_index("createdAt")
-        
-        # Job applications collection
-        job_applications_collection = get_job_applications_collection()
-        if job_applications_collection is not None:
-            await job_applications_collection.create_index("email")
-            await job_applications_collection.create_index("position")
-            await job_applications_collection.create_index("createdAt")
-        
-        # Analytics collection
-        analytics_collection = get_analytics_collection()
-        if analytics_collection is not None:
-            await analytics_collection.create_index("timestamp")
-            await analytics_collection.create_index("eventType")
-    except Exception as e:
-        print(f"❌ Error creating database indexes: {e}")
-        raise
+async def next_sequence_value(counter_name: str) -> int:
+    """Atomically allocate the next value of a named counter"""
+    counters_collection = get_counters_collection()
+    if counters_collection is None:
+        raise Exception("Counters collection not available")
+    
+    counter = await counters_collection.find_one_and_update(
+        {"_id": counter_name},
+        {"$inc": {"value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["value"]
+
+async def next_waitlist_position() -> int:
+    """Allocate the next waitlist position"""
+    return await next_sequence_value(WAITLIST_POSITION_COUNTER)
+
+async def seed_waitlist_counter():
+    """Make sure the waitlist counter is never behind existing positions"""
+    waitlist_collection = get_waitlist_collection()
+    counters_collection = get_counters_collection()
+    if waitlist_collection is None or counters_collection is None:
+        return
+    
+    # Uses the position index, so this stays cheap on every startup
+    last_entry = await waitlist_collection.find_one(
+        {}, projection={"position": 1}, sort=[("position", -1)]
+    )
+    max_position = last_entry.get("position", 0) if last_entry else 0
+    
+    # $max never moves the counter backwards
+    await counters_collection.update_one(
+        {"_id": WAITLIST_POSITION_COUNTER},
+        {"$max": {"value": max_position}},
+        upsert=True
+    )
+
+async def backfill_waitlist_positions(batch_size: int = 1000) -> int:
+    """Renumber existing waitlist positions 1..N by join order and reset the counter"""
+    waitlist_collection = get_waitlist_collection()
+    counters_collection = get_counters_collection()
+    if waitlist_collection is None or counters_collection is None:
+        raise Exception("Database not available")
+    
+    cursor = waitlist_collection.find(
+        {}, projection={"_id": 1, "position": 1}
+    ).sort([("joinedAt", 1), ("_id", 1)]).batch_size(batch_size)
+    
+    position = 0
+    operations = []
+    async for entry in cursor:
+        position += 1
+        if entry.get("position") != position:
+            operations.append(UpdateOne({"_id": entry["_id"]}, {"$set": {"position": position}}))
+        if len(operations) >= batch_size:
+            await waitlist_collection.bulk_write(operations, ordered=False)
+            operations = []
+    
+    if operations:
+        await waitlist_collection.bulk_write(operations, ordered=False)
+    
+    await counters_collection.update_one(
+        {"_id": WAITLIST_POSITION_COUNTER},
+        {"$set": {"value": position}},
+        upsert=True
+    )
+    return position
+
+def index_spec_version(specs: List[dict]) -> str:
+    """Stable fingerprint of a collection's index spec"""
+    return hashlib.sha256(json.dumps(specs, sort_keys=True).encode()).hexdigest()[:16]
+
+async def apply_index_spec(collection_name: str, specs: List[dict]) -> List[Tuple[dict, Exception]]:
+    """Create every index in a collection's spec; returns the (spec, error) pairs that failed"""
+    db = get_db()
+    collection = db[collection_name]
+    failures = []
+    for spec in specs:
+        options = {key: value for key, value in spec.items() if key not in ("keys", "required")}
+        try:
+            try:
+                await collection.create_index(spec["keys"], **options)
+            except OperationFailure as e:
+                if e.code != INDEX_OPTIONS_CONFLICT or "expireAfterSeconds" not in options:
+                    raise
+                # A changed TTL can be updated in place instead of rebuilding the index
+                await db.command(
+                    "collMod", collection_name,
+                    index={"keyPattern": dict(spec["keys"]), "expireAfterSeconds": options["expireAfterSeconds"]}
+                )
+        except Exception as e:
+            failures.append((spec, e))
+    return failures
+
+async def create_indexes(force: bool = False) -> List[str]:
+    """Apply INDEX_SPECS, skipping collections whose spec is unchanged since it was last applied
+
+    Raises RequiredIndexError if a required index fails; other failures are only logged.
+    """
+    index_versions_collection = get_index_versions_collection()
+    if index_versions_collection is None:
+        return []
+    
+    applied = {}
+    async for entry in index_versions_collection.find({}):
+        applied[entry["_id"]] = entry.get("version")
+    
+    pending = {
+        name: index_spec_version(specs)
+        for name, specs in INDEX_SPECS.items()
+        if force or applied.get(name) != index_spec_version(specs)
+    }
+    if not pending:
+        return []
+    
+    results = await asyncio.gather(
+        *(apply_index_spec(name, INDEX_SPECS[name]) for name in pending)
+    )
+    
+    updated = []
+    missing_required = []
+    for (name, version), failures in zip(pending.items(), results):
+        if failures:
+            # Leave the version unrecorded so the next startup retries it
+            # (e.g. older data with duplicate follows blocks the unique index)
+            for spec, error in failures:
+                print(f"⚠️ Could not apply index {spec['keys']} on {name}: {error}")
+                if spec.get("required"):
+                    missing_required.append(f"{name} {spec['keys']}")
+            continue
+        await index_versions_collection.update_one(
+            {"_id": name},
+            {"$set": {"version": version, "appliedAt": datetime.utcnow().isoformat()}},
+            upsert=True
+        )
+        updated.append(name)
+    
+    if missing_required:
+        raise RequiredIndexError(f"Required indexes missing: {'; '.join(missing_required)}")
+    return updated
 
 async def init_database():
     """Initialize database with indexes"""
@@ -220,8 +398,13 @@ async def init_database():
         if db is None:
             raise Exception("Database access failed")
         
-        await create_indexes()
-        print("✅ Database indexes created successfully")
+        updated = await create_indexes()
+        if updated:
+            print(f"✅ Database indexes applied for: {', '.join(updated)}")
+        else:
+            print("✅ Database indexes up to date")
+        
+        await seed_waitlist_counter()
     except Exception as e:
         print(f"❌ Error creating database indexes: {e}")
         raise 
\ No newline at end of file
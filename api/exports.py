@@ -0,0 +1,101 @@
+"""
+Streaming NDJSON/CSV exports of admin collections
+"""
+
+import os
+import io
+import csv
+import json
+import zlib
+from typing import AsyncIterator, Dict, Any, List
+from database import get_waitlist_collection, get_contact_messages_collection, get_job_applications_collection
+from cell_format import format_cell
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Rows serialized per yielded chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+EXPORT_SPECS = {
+    "waitlist": {
+        "collection": get_waitlist_collection,
+        "sort": "joinedAt",
+        "fields": ["_id", "email", "name", "interests", "position", "joinedAt", "referrals", "status"]
+    },
+    "contacts": {
+        "collection": get_contact_messages_collection,
+        "sort": "createdAt",
+        "fields": ["_id", "name", "email", "message", "status", "createdAt"]
+    },
+    "applications": {
+        "collection": get_job_applications_collection,
+        "sort": "createdAt",
+        "fields": ["_id", "position", "name", "email", "phone", "coverLetter", "resumeUrl", "status", "createdAt"]
+    }
+}
+
+def open_export_cursor(collection, spec: Dict[str, Any]):
+    """Oldest-first cursor over the export fields, walking the (sort, _id) index"""
+    projection = {field: 1 for field in spec["fields"]}
+    return collection.find({}, projection).sort(
+        [(spec["sort"], 1), ("_id", 1)]
+    ).batch_size(EXPORT_BATCH_SIZE)
+
+def ndjson_chunk(documents: List[Dict[str, Any]], fields: List[str]) -> str:
+    return "".join(
+        json.dumps({field: document.get(field) for field in fields}, default=str) + "\n"
+        for document in documents
+    )
+
+def csv_chunk(rows: List[List[str]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+async def iter_export(cursor, fields: List[str], export_format: str) -> AsyncIterator[bytes]:
+    """Yield the export in chunks of EXPORT_CHUNK_ROWS documents"""
+    if export_format == "csv":
+        yield csv_chunk([fields]).encode()
+
+    documents = []
+    async for document in cursor:
+        documents.append(document)
+        if len(documents) >= EXPORT_CHUNK_ROWS:
+            yield serialize(documents, fields, export_format)
+            documents = []
+    if documents:
+        yield serialize(documents, fields, export_format)
+
+def serialize(documents: List[Dict[str, Any]], fields: List[str], export_format: str) -> bytes:
+    if export_format == "csv":
+        return csv_chunk([[format_cell(document.get(field)) for field in fields] for document in documents]).encode()
+    return ndjson_chunk(documents, fields).encode()
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+async def export_stream(collection_key: str, export_format: str, gzip: bool = False) -> AsyncIterator[bytes]:
+    spec = EXPORT_SPECS[collection_key]
+    collection = spec["collection"]()
+    cursor = open_export_cursor(collection, spec)
+    chunks = iter_export(cursor, spec["fields"], export_format)
+    try:
+        if gzip:
+            chunks = gzip_stream(chunks)
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        # Headers are already sent, so all we can do is cut the stream short
+        print(f"❌ Export of {collection_key} failed: {e}")
+        raise
+    finally:
+        await cursor.close()
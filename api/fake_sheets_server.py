@@ -0,0 +1,321 @@
+"""
+Local stand-in for the subset of the Google Sheets v4 REST API used by GoogleSheetsManager
+
+Run it with:
+    uvicorn fake_sheets_server:app --port 8090
+and point the backend at it with SHEETS_API_BASE_URL=http://localhost:8090
+"""
+
+import os
+import re
+import time
+import uuid
+import random
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import FastAPI, Body, Query, Request
+from fastapi.responses import JSONResponse
+
+# Simulated network conditions
+FAKE_SHEETS_LATENCY_MS = float(os.getenv("FAKE_SHEETS_LATENCY_MS", "0"))
+FAKE_SHEETS_QUOTA_PER_MINUTE = int(os.getenv("FAKE_SHEETS_QUOTA_PER_MINUTE", "0"))  # 0 = unlimited
+FAKE_SHEETS_ERROR_RATE = float(os.getenv("FAKE_SHEETS_ERROR_RATE", "0"))  # share of requests answered with 503
+
+A1_PATTERN = re.compile(r"^([A-Z]*)(\d*)$")
+
+def column_number(letters: str) -> int:
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - 64
+    return number
+
+def parse_a1(range_name: str) -> Tuple[str, int, int, Optional[int], Optional[int]]:
+    """'Title!A2:F' -> (title, start_row, start_col, end_row, end_col); all 1-based, None = open"""
+    title, _, cells = range_name.rpartition('!')
+    title = title.strip("'")
+    start, _, end = cells.partition(':')
+    start_match, end_match = A1_PATTERN.match(start), A1_PATTERN.match(end or start)
+    if not title or not start_match or not end_match:
+        raise ValueError(f"Unable to parse range: {range_name}")
+    start_col = column_number(start_match.group(1)) if start_match.group(1) else 1
+    start_row = int(start_match.group(2)) if start_match.group(2) else 1
+    end_col = column_number(end_match.group(1)) if end_match.group(1) else None
+    end_row = int(end_match.group(2)) if end_match.group(2) else None
+    return title, start_row, start_col, end_row, end_col
+
+class ApiError(Exception):
+    def __init__(self, status_code: int, message: str, status: str):
+        self.status_code = status_code
+        self.message = message
+        self.status = status
+
+class FakeSheet:
+    def __init__(self, sheet_id: int, title: str, row_count: int = 1000, column_count: int = 26):
+        self.sheet_id = sheet_id
+        self.title = title
+        self.row_count = row_count
+        self.column_count = column_count
+        self.rows: Dict[int, List[Any]] = {}
+
+    def properties(self) -> Dict[str, Any]:
+        return {
+            'sheetId': self.sheet_id,
+            'title': self.title,
+            'gridProperties': {'rowCount': self.row_count, 'columnCount': self.column_count}
+        }
+
+    def last_row(self) -> int:
+        return max((row for row, values in self.rows.items() if any(v != '' for v in values)), default=0)
+
+    def write(self, start_row: int, start_col: int, values: List[List[Any]]):
+        end_row = start_row + len(values) - 1
+        end_col = start_col + max((len(row) for row in values), default=1) - 1
+        if end_row > self.row_count or end_col > self.column_count:
+            raise ApiError(
+                400,
+                f"Range ({self.title}!R{start_row}C{start_col}:R{end_row}C{end_col}) exceeds grid limits. "
+                f"Max rows: {self.row_count}, max columns: {self.column_count}",
+                "INVALID_ARGUMENT"
+            )
+        for offset, row_values in enumerate(values):
+            row = self.rows.setdefault(start_row + offset, [])
+            needed = start_col - 1 + len(row_values)
+            if len(row) < needed:
+                row.extend([''] * (needed - len(row)))
+            row[start_col - 1:needed] = ['' if value is None else value for value in row_values]
+
+    def read(self, start_row: int, start_col: int, end_row: Optional[int], end_col: Optional[int]) -> List[List[Any]]:
+        end_row = end_row or self.last_row()
+        values = []
+        for row in range(start_row, end_row + 1):
+            row_values = self.rows.get(row, [])
+            values.append(row_values[start_col - 1:end_col])
+        # The real API trims trailing empty rows and cells
+        for row in values:
+            while row and row[-1] == '':
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def clear(self, start_row: int, start_col: int, end_row: Optional[int], end_col: Optional[int]):
+        end_row = end_row or self.row_count
+        for row in list(self.rows):
+            if start_row <= row <= end_row:
+                values = self.rows[row]
+                stop = min(len(values), end_col or len(values))
+                for index in range(start_col - 1, stop):
+                    values[index] = ''
+
+class FakeSheetsState:
+    def __init__(self, latency_ms: float, quota_per_minute: int, error_rate: float):
+        self.latency_ms = latency_ms
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self.spreadsheets: Dict[str, Dict[str, Any]] = {}
+        self.request_times: List[float] = []
+        self.counters = {"requests": 0, "quotaErrors": 0, "injectedErrors": 0, "cellsWritten": 0}
+
+    def spreadsheet(self, spreadsheet_id: str) -> Dict[str, Any]:
+        if spreadsheet_id not in self.spreadsheets:
+            raise ApiError(404, "Requested entity was not found.", "NOT_FOUND")
+        return self.spreadsheets[spreadsheet_id]
+
+    def sheet(self, spreadsheet_id: str, title: str) -> FakeSheet:
+        sheets = self.spreadsheet(spreadsheet_id)['sheets']
+        if title not in sheets:
+            raise ApiError(400, f"Unable to parse range: {title}", "INVALID_ARGUMENT")
+        return sheets[title]
+
+    def create(self, body: Dict[str, Any], spreadsheet_id: str = None) -> Dict[str, Any]:
+        spreadsheet_id = spreadsheet_id or uuid.uuid4().hex
+        spreadsheet = {'properties': body.get('properties', {'title': 'Untitled'}), 'sheets': {}}
+        self.spreadsheets[spreadsheet_id] = spreadsheet
+        for sheet in body.get('sheets') or [{'properties': {'title': 'Sheet1'}}]:
+            self.add_sheet(spreadsheet_id, sheet.get('properties', {}))
+        return self.describe(spreadsheet_id)
+
+    def add_sheet(self, spreadsheet_id: str, properties: Dict[str, Any]) -> FakeSheet:
+        sheets = self.spreadsheets[spreadsheet_id]['sheets']
+        title = properties.get('title') or f"Sheet{len(sheets) + 1}"
+        if title in sheets:
+            raise ApiError(400, f'A sheet with the name "{title}" already exists.', "INVALID_ARGUMENT")
+        grid = properties.get('gridProperties', {})
+        sheet = FakeSheet(
+            properties.get('sheetId', max((s.sheet_id for s in sheets.values()), default=-1) + 1),
+            title,
+            grid.get('rowCount', 1000),
+            grid.get('columnCount', 26)
+        )
+        sheets[title] = sheet
+        return sheet
+
+    def describe(self, spreadsheet_id: str) -> Dict[str, Any]:
+        spreadsheet = self.spreadsheet(spreadsheet_id)
+        return {
+            'spreadsheetId': spreadsheet_id,
+            'properties': spreadsheet['properties'],
+            'sheets': [{'properties': sheet.properties()} for sheet in spreadsheet['sheets'].values()]
+        }
+
+    def total_cells(self, spreadsheet_id: str) -> int:
+        return sum(s.row_count * s.column_count for s in self.spreadsheet(spreadsheet_id)['sheets'].values())
+
+    async def admit(self):
+        """Apply simulated latency, quota and transient errors to one request"""
+        self.counters["requests"] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self.quota_per_minute:
+            now = time.monotonic()
+            self.request_times = [t for t in self.request_times if now - t < 60]
+            if len(self.request_times) >= self.quota_per_minute:
+                self.counters["quotaErrors"] += 1
+                raise ApiError(
+                    429,
+                    "Quota exceeded for quota metric 'Write requests' and limit 'Write requests per minute per user'",
+                    "RESOURCE_EXHAUSTED"
+                )
+            self.request_times.append(now)
+        if self.error_rate and random.random() < self.error_rate:
+            self.counters["injectedErrors"] += 1
+            raise ApiError(503, "The service is currently unavailable.", "UNAVAILABLE")
+
+    def write_range(self, spreadsheet_id: str, range_name: str, values: List[List[Any]]) -> Dict[str, Any]:
+        title, start_row, start_col, _, _ = parse_a1(range_name)
+        self.sheet(spreadsheet_id, title).write(start_row, start_col, values)
+        cells = sum(len(row) for row in values)
+        self.counters["cellsWritten"] += cells
+        return {'spreadsheetId': spreadsheet_id, 'updatedRange': range_name, 'updatedRows': len(values), 'updatedCells': cells}
+
+def create_app(
+    latency_ms: float = FAKE_SHEETS_LATENCY_MS,
+    quota_per_minute: int = FAKE_SHEETS_QUOTA_PER_MINUTE,
+    error_rate: float = FAKE_SHEETS_ERROR_RATE
+) -> FastAPI:
+    fake_app = FastAPI(title="Fake Google Sheets API")
+    state = FakeSheetsState(latency_ms, quota_per_minute, error_rate)
+    fake_app.state.sheets = state
+
+    @fake_app.exception_handler(ApiError)
+    async def api_error_handler(request: Request, exc: ApiError):
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={'error': {'code': exc.status_code, 'message': exc.message, 'status': exc.status}}
+        )
+
+    @fake_app.exception_handler(ValueError)
+    async def value_error_handler(request: Request, exc: ValueError):
+        return JSONResponse(
+            status_code=400,
+            content={'error': {'code': 400, 'message': str(exc), 'status': 'INVALID_ARGUMENT'}}
+        )
+
+    # Routes with a ":action" suffix go first so they aren't swallowed by the plain range routes
+
+    @fake_app.post("/v4/spreadsheets")
+    async def create_spreadsheet(body: Dict[str, Any] = Body(...)):
+        await state.admit()
+        return state.create(body)
+
+    @fake_app.post("/v4/spreadsheets/{spreadsheet_id}:batchUpdate")
+    async def batch_update(spreadsheet_id: str, body: Dict[str, Any] = Body(...)):
+        await state.admit()
+        state.spreadsheet(spreadsheet_id)
+        replies = []
+        for request in body.get('requests', []):
+            if 'addSheet' in request:
+                sheet = state.add_sheet(spreadsheet_id, request['addSheet'].get('properties', {}))
+                replies.append({'addSheet': {'properties': sheet.properties()}})
+            elif 'updateSheetProperties' in request:
+                properties = request['updateSheetProperties']['properties']
+                sheet = next(
+                    (s for s in state.spreadsheet(spreadsheet_id)['sheets'].values() if s.sheet_id == properties.get('sheetId')),
+                    None
+                )
+                if sheet is None:
+                    raise ApiError(400, f"No grid with id: {properties.get('sheetId')}", "INVALID_ARGUMENT")
+                grid = properties.get('gridProperties', {})
+                sheet.row_count = grid.get('rowCount', sheet.row_count)
+                sheet.column_count = grid.get('columnCount', sheet.column_count)
+                replies.append({})
+            else:
+                raise ApiError(400, f"Unsupported request: {list(request)}", "INVALID_ARGUMENT")
+        if state.total_cells(spreadsheet_id) > 10_000_000:
+            raise ApiError(400, "This action would increase the number of cells in the workbook above the limit of 10000000 cells.", "INVALID_ARGUMENT")
+        return {'spreadsheetId': spreadsheet_id, 'replies': replies}
+
+    @fake_app.get("/v4/spreadsheets/{spreadsheet_id}")
+    async def get_spreadsheet(spreadsheet_id: str):
+        await state.admit()
+        return state.describe(spreadsheet_id)
+
+    @fake_app.get("/v4/spreadsheets/{spreadsheet_id}/values:batchGet")
+    async def values_batch_get(spreadsheet_id: str, ranges: List[str] = Query(...)):
+        await state.admit()
+        value_ranges = []
+        for range_name in ranges:
+            title, start_row, start_col, end_row, end_col = parse_a1(range_name)
+            values = state.sheet(spreadsheet_id, title).read(start_row, start_col, end_row, end_col)
+            value_ranges.append({'range': range_name, 'majorDimension': 'ROWS', 'values': values})
+        return {'spreadsheetId': spreadsheet_id, 'valueRanges': value_ranges}
+
+    @fake_app.post("/v4/spreadsheets/{spreadsheet_id}/values:batchUpdate")
+    async def values_batch_update(spreadsheet_id: str, body: Dict[str, Any] = Body(...)):
+        await state.admit()
+        responses = [state.write_range(spreadsheet_id, item['range'], item.get('values', [])) for item in body.get('data', [])]
+        return {
+            'spreadsheetId': spreadsheet_id,
+            'totalUpdatedRows': sum(r['updatedRows'] for r in responses),
+            'totalUpdatedCells': sum(r['updatedCells'] for r in responses),
+            'responses': responses
+        }
+
+    @fake_app.post("/v4/spreadsheets/{spreadsheet_id}/values:batchClear")
+    async def values_batch_clear(spreadsheet_id: str, body: Dict[str, Any] = Body(...)):
+        await state.admit()
+        for range_name in body.get('ranges', []):
+            title, start_row, start_col, end_row, end_col = parse_a1(range_name)
+            state.sheet(spreadsheet_id, title).clear(start_row, start_col, end_row, end_col)
+        return {'spreadsheetId': spreadsheet_id, 'clearedRanges': body.get('ranges', [])}
+
+    @fake_app.post("/v4/spreadsheets/{spreadsheet_id}/values/{range_name}:append")
+    async def values_append(spreadsheet_id: str, range_name: str, body: Dict[str, Any] = Body(...), insertDataOption: str = "OVERWRITE"):
+        await state.admit()
+        title, _, start_col, _, _ = parse_a1(range_name)
+        sheet = state.sheet(spreadsheet_id, title)
+        values = body.get('values', [])
+        start_row = sheet.last_row() + 1
+        if insertDataOption == "INSERT_ROWS":
+            sheet.row_count = max(sheet.row_count, start_row + len(values) - 1)
+        sheet.write(start_row, start_col, values)
+        state.counters["cellsWritten"] += sum(len(row) for row in values)
+        return {'spreadsheetId': spreadsheet_id, 'updates': {'updatedRows': len(values)}}
+
+    @fake_app.post("/v4/spreadsheets/{spreadsheet_id}/values/{range_name}:clear")
+    async def values_clear(spreadsheet_id: str, range_name: str):
+        await state.admit()
+        title, start_row, start_col, end_row, end_col = parse_a1(range_name)
+        state.sheet(spreadsheet_id, title).clear(start_row, start_col, end_row, end_col)
+        return {'spreadsheetId': spreadsheet_id, 'clearedRange': range_name}
+
+    @fake_app.get("/v4/spreadsheets/{spreadsheet_id}/values/{range_name}")
+    async def values_get(spreadsheet_id: str, range_name: str):
+        await state.admit()
+        title, start_row, start_col, end_row, end_col = parse_a1(range_name)
+        values = state.sheet(spreadsheet_id, title).read(start_row, start_col, end_row, end_col)
+        return {'range': range_name, 'majorDimension': 'ROWS', 'values': values}
+
+    @fake_app.put("/v4/spreadsheets/{spreadsheet_id}/values/{range_name}")
+    async def values_update(spreadsheet_id: str, range_name: str, body: Dict[str, Any] = Body(...)):
+        await state.admit()
+        return state.write_range(spreadsheet_id, range_name, body.get('values', []))
+
+    @fake_app.get("/_fake/stats")
+    async def fake_stats():
+        """Request counters for benchmarks (not part of the Sheets API)"""
+        return state.counters
+
+    return fake_app
+
+app = create_app()
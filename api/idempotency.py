@@ -0,0 +1,204 @@
+"""
+Idempotency-Key support: replay the first response for retried POSTs without re-running the handler
+"""
+
+import os
+import time
+import uuid
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from starlette.middleware.base import BaseHTTPMiddleware
+from database import get_idempotency_keys_collection, IDEMPOTENCY_KEY_TTL_SECONDS
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# A "processing" claim older than this is treated as abandoned (crashed or restarted worker) and can be reclaimed
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+MAX_KEY_LENGTH = 255
+
+# Public POST endpoints that mobile clients retry
+IDEMPOTENT_PATHS = {
+    "/api/waitlist",
+    "/api/contact",
+    "/api/jobs/apply",
+    "/api/stocks/swipe"
+}
+
+class IdempotencyCache:
+    """Small in-process LRU of completed responses, each with its own expiry"""
+
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_SIZE, ttl_seconds: int = IDEMPOTENCY_KEY_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.replayed = 0
+        self.conflicts = 0
+        self.mismatches = 0
+        self.reclaimed = 0
+        self.store_errors = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return record
+
+    def put(self, key: str, record: Dict[str, Any]):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, record)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self.entries),
+            "capacity": self.max_size,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+            "mismatches": self.mismatches,
+            "reclaimed": self.reclaimed,
+            "storeErrors": self.store_errors
+        }
+
+def replay(record: Dict[str, Any]) -> Response:
+    return Response(
+        content=record["body"],
+        status_code=record["statusCode"],
+        media_type=record.get("contentType"),
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+def error_response(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, paths=IDEMPOTENT_PATHS, cache: IdempotencyCache = None):
+        super().__init__(app)
+        self.paths = paths
+        self.cache = cache or idempotency_cache
+
+    async def dispatch(self, request: Request, call_next):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if request.method != "POST" or request.url.path not in self.paths or not key:
+            return await call_next(request)
+        if len(key) > MAX_KEY_LENGTH:
+            return error_response(400, f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+        cache_key = f"{request.url.path}:{key}"
+        fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+        # Fast path: this process already answered the key
+        record = self.cache.get(cache_key)
+        if record is not None:
+            return self._replay(record, fingerprint)
+
+        collection = get_idempotency_keys_collection()
+        # Our claim on the key; releases and completions only ever touch the claim we hold
+        lease = {"_id": cache_key, "leaseId": uuid.uuid4().hex}
+        if collection is not None:
+            now = datetime.now(timezone.utc)
+            # Claim the key in one round-trip; the unique _id settles races between workers
+            try:
+                try:
+                    await collection.insert_one({
+                        **lease,
+                        "status": "processing",
+                        "fingerprint": fingerprint,
+                        "createdAt": now,
+                        "lockedAt": now
+                    })
+                except DuplicateKeyError:
+                    record = await collection.find_one({"_id": cache_key})
+                    if record is None:
+                        # Expired between the insert and the read; just run the request
+                        return await call_next(request)
+                    if record.get("status") == "completed":
+                        self.cache.put(cache_key, record)
+                        return self._replay(record, fingerprint)
+                    if not await self._reclaim(collection, lease, fingerprint, now):
+                        self.cache.conflicts += 1
+                        return error_response(409, "A request with this Idempotency-Key is still in progress")
+            except PyMongoError as e:
+                # The handler hasn't run, so don't fail the request over the key store;
+                # it runs unprotected, with only the in-process cache remembering the answer
+                self._store_failed("claim", e)
+                collection = None
+
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            # Cancellation included; anything that never reaches a response gives the key back
+            if collection is not None:
+                await self._store(collection.delete_one(lease), "release")
+            raise
+
+        if response.status_code >= 500:
+            # Let the client retry server errors for real
+            if collection is not None:
+                await self._store(collection.delete_one(lease), "release")
+        else:
+            record = {
+                "status": "completed",
+                "fingerprint": fingerprint,
+                "statusCode": response.status_code,
+                "contentType": response.headers.get("content-type"),
+                "body": body
+            }
+            if collection is not None:
+                await self._store(collection.update_one(lease, {"$set": record}), "completion")
+            self.cache.put(cache_key, record)
+
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            media_type=response.media_type
+        )
+
+    def _store_failed(self, operation: str, error: Exception):
+        self.cache.store_errors += 1
+        print(f"⚠️ Idempotency key {operation} failed: {error}")
+
+    async def _store(self, write, operation: str):
+        # The handler already ran; a failed key write must not turn its response into a 500
+        try:
+            await write
+        except PyMongoError as e:
+            self._store_failed(operation, e)
+
+    async def _reclaim(self, collection, lease: Dict[str, str], fingerprint: str, now: datetime) -> bool:
+        """Take over a "processing" claim whose lease ran out; the filter makes the takeover atomic"""
+        stale_before = now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+        result = await collection.update_one(
+            {"_id": lease["_id"], "status": "processing", "$or": [
+                {"lockedAt": {"$lt": stale_before}},
+                # Claims written before leases existed
+                {"lockedAt": {"$exists": False}, "createdAt": {"$lt": stale_before}}
+            ]},
+            {"$set": {"leaseId": lease["leaseId"], "fingerprint": fingerprint, "lockedAt": now}}
+        )
+        if not result.modified_count:
+            return False
+        self.cache.reclaimed += 1
+        return True
+
+    def _replay(self, record: Dict[str, Any], fingerprint: str) -> Response:
+        if record.get("fingerprint") != fingerprint:
+            self.cache.mismatches += 1
+            return error_response(422, "Idempotency-Key was already used with a different request body")
+        self.cache.replayed += 1
+        return replay(record)
+
+# Global instance
+idempotency_cache = IdempotencyCache()
@@ -11,10 +11,12 @@ from typing import Dict, List, Optional, Any
 import json
 import re
 
-from fastapi import FastAPI, HTTPException, Depends, status, Body
+from fastapi import FastAPI, HTTPException, Depends, status, Body, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, validator, ValidationError
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import jwt
 from passlib.context import CryptContext
 import asyncio
@@ -24,10 +26,28 @@ from collections import defaultdict
 from database import (
     get_users_collection, get_waitlist_collection, get_contact_messages_collection,
     get_job_applications_collection, get_analytics_collection, get_portfolios_collection,
-    get_follows_collection, get_chat_sessions_collection, init_database,
+    get_follows_collection, init_database, next_waitlist_position, RequiredIndexError,
     UserModel, WaitlistModel, ContactMessageModel, JobApplicationModel, AnalyticsModel
 )
-from sheets_integration import sheets_manager
+from sheets_integration import sheets_manager, sheets_sync_scheduler
+from sheets_client import sheets_request_scheduler
+from analytics_buffer import analytics_buffer, AnalyticsBufferFull
+from password_hashing import password_hasher, PasswordHasherSaturated
+from idempotency import IdempotencyMiddleware, idempotency_cache
+from market_data import market_data
+from risk_model import UnknownAsset
+from monte_carlo import SIMULATION_PATHS, SIMULATION_MAX_PATHS, SIMULATION_MAX_MONTHS
+from compute_pool import (
+    compute_pool, optimize_portfolio_job, simulate_portfolio_job,
+    ComputePoolSaturated, ComputeDeadlineExceeded, ComputeCancelled
+)
+from price_feed import price_feed
+from price_stream import price_hub, tick_source, PRICE_TICK_SIMULATION
+from chat_backend import chat_responder
+from chat_history import chat_history, ChatHistoryUnavailable, CHAT_HISTORY_PAGE_SIZE
+from admin_stats import admin_stats, StatsUnavailable
+from exports import export_stream, EXPORT_SPECS, EXPORT_FORMATS
+from pagination import fetch_page, select_fields, InvalidCursor, ADMIN_PAGE_SIZE
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,6 +56,10 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Replay responses for retried POSTs that carry an Idempotency-Key
+# (added before CORS so CORS stays outermost and also covers replays)
+app.add_middleware(IdempotencyMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -51,18 +75,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-here")
 JWT_ALGORITHM = "HS256"
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "change-this-in-production")
-
-# Stock data simulation - Updated with current prices
-STOCK_PRICES = {
-    "AAPL": {"price": 214.46, "change": 0.31, "volume": 52000000, "marketCap": "2.9T"},
-    "TSLA": {"price": 302.28, "change": -30.28, "volume": 41000000, "marketCap": "778B"},
-    "NVDA": {"price": 172.79, "change": 2.01, "volume": 35000000, "marketCap": "1.05T"},
-    "GOOGL": {"price": 141.52, "change": 1.1, "volume": 28000000, "marketCap": "1.57T"},
-    "AMZN": {"price": 142.75, "change": 1.8, "volume": 33000000, "marketCap": "1.48T"},
-    "MSFT": {"price": 414.31, "change": 0.8, "volume": 25000000, "marketCap": "2.71T"},
-    "META": {"price": 315.8, "change": -0.5, "volume": 18000000, "marketCap": "798B"},
-    "SPY": {"price": 445.6, "change": 1.1, "volume": 85000000, "marketCap": "ETF"},
-}
+MAX_ANALYTICS_BATCH_SIZE = int(os.getenv("MAX_ANALYTICS_BATCH_SIZE", "500"))
 
 # Pydantic Models
 class UserRegister(BaseModel):
@@ -99,6 +112,27 @@ class PortfolioOptimization(BaseModel):
 class PortfolioSimulation(BaseModel):
     allocation: Dict[str, float]
     timeframe: int = 12
+    initialValue: float = 10000
+    paths: Optional[int] = None
+    seed: Optional[int] = None
+
+    @validator('timeframe')
+    def validate_timeframe(cls, v):
+        if v < 1 or v > SIMULATION_MAX_MONTHS:
+            raise ValueError(f'Timeframe must be between 1 and {SIMULATION_MAX_MONTHS} months')
+        return v
+
+    @validator('initialValue')
+    def validate_initial_value(cls, v):
+        if v <= 0:
+            raise ValueError('Initial value must be positive')
+        return v
+
+    @validator('paths')
+    def validate_paths(cls, v):
+        if v is not None and (v < 100 or v > SIMULATION_MAX_PATHS):
+            raise ValueError(f'Paths must be between 100 and {SIMULATION_MAX_PATHS}')
+        return v
 
 class StockSwipe(BaseModel):
     symbol: str
@@ -153,11 +187,22 @@ def validate_email(email: str) -> bool:
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def run_password_job(fn, *args):
+    # bcrypt takes 100-300ms of CPU; run it on the bounded pool, shed load when it is full
+    try:
+        return await password_hasher.run(fn, *args)
+    except PasswordHasherSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+async def hash_password(password: str) -> str:
+    return await run_password_job(pwd_context.hash, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_job(pwd_context.verify, plain_password, hashed_password)
 
 def create_jwt_token(data: dict) -> str:
     expiration = datetime.utcnow() + timedelta(days=7)
@@ -188,65 +233,18 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     return payload
 
-def generate_portfolio_optimization(risk_level: str, investment_amount: float, preferences: Dict = None) -> Dict:
-    # Portfolio optimization logic (unchanged)
-    allocations = {
-        "conservative": {"stocks": 0.3, "bonds": 0.6, "cash": 0.1},
-        "moderate": {"stocks": 0.6, "bonds": 0.3, "cash": 0.1},
-        "aggressive": {"stocks": 0.8, "bonds": 0.15, "cash": 0.05}
-    }
-    
-    allocation = allocations.get(risk_level, allocations["moderate"])
-    expected_returns = {
-        "conservative": "8.5%",
-        "moderate": "11.2%",
-        "aggressive": "14.8%"
-    }
-    
-    risk_scores = {"conservative": 3, "moderate": 6, "aggressive": 9}
-    
-    return {
-        "totalValue": investment_amount,
-        "expectedReturn": expected_returns.get(risk_level, "11.2%"),
-        "riskScore": risk_scores.get(risk_level, 6),
-        "allocations": allocation,
-        "recommendations": [
-            {
-                "symbol": "AAPL",
-                "allocation": "20.0",
-                "amount": str(investment_amount * 0.2),
-                "currentPrice": 214.46,
-                "expectedReturn": "12.5%"
-            },
-            {
-                "symbol": "NVDA",
-                "allocation": "20.0",
-                "amount": str(investment_amount * 0.2),
-                "currentPrice": 172.79,
-                "expectedReturn": "15.2%"
-            },
-            {
-                "symbol": "TSLA",
-                "allocation": "20.0",
-                "amount": str(investment_amount * 0.2),
-                "currentPrice": 302.28,
-                "expectedReturn": "18.7%"
-            }
-        ],
-        "rebalanceDate": (datetime.now() + timedelta(days=90)).isoformat(),
-        "diversificationScore": 8.5
-    }
-
-def generate_chat_response(message: str, user_id: str = None) -> str:
-    # Simple AI response generation (unchanged)
-    responses = [
-        "That's an interesting question about investing!",
-        "I'd be happy to help you with your investment strategy.",
-        "Let me analyze that for you...",
-        "Based on current market conditions...",
-        "Here's what I think about that..."
-    ]
-    return responses[hash(message) % len(responses)]
+def build_analytics_model(event: AnalyticsEvent) -> AnalyticsModel:
+    return AnalyticsModel(
+        eventType=event.eventType,
+        page=event.page,
+        sessionId=event.sessionId,
+        timestamp=event.timestamp,
+        userAgent=event.userAgent,
+        location=event.location,
+        element=event.element,
+        value=event.value,
+        referrer=event.referrer
+    )
 
 # Startup event
 @app.on_event("startup")
@@ -255,10 +253,28 @@ async def startup_event():
     try:
         await init_database()
         print("🚀 Swipr.ai API started with persistent storage")
+    except RequiredIndexError:
+        # Without the unique indexes, duplicate users and signups would get in; refuse to serve
+        raise
     except Exception as e:
         print(f"⚠️ Database initialization failed: {e}")
         print("📝 The API will run with limited functionality. Set up MongoDB to enable full features.")
         print("🔗 Get a free MongoDB Atlas cluster: https://www.mongodb.com/atlas")
+    
+    await analytics_buffer.start()
+    await compute_pool.warm()
+    if PRICE_TICK_SIMULATION:
+        tick_source.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered writes before the process exits"""
+    await tick_source.stop()
+    await analytics_buffer.stop()
+    await sheets_sync_scheduler.stop()
+    await sheets_manager.close()
+    password_hasher.shutdown()
+    compute_pool.shutdown()
 
 # Root endpoint
 @app.get("/")
@@ -347,16 +363,15 @@ async def ping():
 
 @app.post("/api/auth/register")
 async def register(user_data: UserRegister):
-    # Check if user already exists
     users_collection = get_users_collection()
     if users_collection is None:
         raise HTTPException(status_code=503, detail="Database not available")
     
-    existing_user = await users_collection.find_one({"email": user_data.email})
-    if existing_user:
+    # An indexed lookup costs far less than a bcrypt hash, so turn away known emails before hashing
+    if await users_collection.find_one({"email": user_data.email}, projection={"_id": 1}):
         raise HTTPException(status_code=409, detail="User already exists")
     
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     user_id = generate_id()
     
     user = UserModel(
@@ -372,7 +387,11 @@ async def register(user_data: UserRegister):
         }
     )
     
-    await users_collection.insert_one(user.dict(by_alias=True))
+    # The unique email index still settles signups racing past the lookup
+    try:
+        await users_collection.insert_one(user.dict(by_alias=True))
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="User already exists")
     
     token = create_jwt_token({"userId": user_id, "email": user_data.email})
     
@@ -392,7 +411,7 @@ async def login(user_data: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(user_data.password, user["password"]):
+    if not await verify_password(user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_jwt_token({"userId": str(user["_id"]), "email": user_data.email})
@@ -418,13 +437,8 @@ async def add_to_waitlist(entry: WaitlistEntry):
     if waitlist_collection is None:
         raise HTTPException(status_code=503, detail="Database not available")
     
-    # Check if email already exists
-    existing_entry = await waitlist_collection.find_one({"email": entry.email})
-    if existing_entry:
-        raise HTTPException(status_code=409, detail="Email already on waitlist")
-    
-    # Get current position
-    position = await waitlist_collection.count_documents({}) + 1
+    # Allocate position from the atomic counter (safe across workers)
+    position = await next_waitlist_position()
     
     waitlist_entry = WaitlistModel(
         email=entry.email,
@@ -436,15 +450,20 @@ async def add_to_waitlist(entry: WaitlistEntry):
         status="active"
     )
     
-    await waitlist_collection.insert_one(waitlist_entry.dict(by_alias=True))
+    # The unique email index rejects duplicates in the same round-trip
+    # (a rejected signup leaves a gap in positions, which is harmless)
+    try:
+        await waitlist_collection.insert_one(waitlist_entry.dict(by_alias=True))
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Email already on waitlist")
     
     # Sync to Google Sheets only in production
     if os.getenv("ENVIRONMENT") == "production":
-        print(f"🔄 Attempting to sync waitlist to Google Sheets...")
+        print(f"🔄 Scheduling waitlist sync to Google Sheets...")
         print(f"📊 Environment: {os.getenv('ENVIRONMENT')}")
         print(f"📄 Service Account: {'Set' if os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON') else 'Not set'}")
         print(f"📊 Spreadsheet ID: {os.getenv('GOOGLE_SPREADSHEET_ID', 'Not set')}")
-        asyncio.create_task(sheets_manager.sync_waitlist())
+        sheets_sync_scheduler.request_sync("waitlist")
     else:
         print(f"⏭️ Skipping Google Sheets sync (ENVIRONMENT={os.getenv('ENVIRONMENT', 'not set')})")
     
@@ -456,13 +475,41 @@ async def add_to_waitlist(entry: WaitlistEntry):
 
 # ==================== PORTFOLIO ENDPOINTS ====================
 
+async def wait_for_disconnect(request: Request):
+    # The body has already been read, so the next ASGI message can only be the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def run_compute_job(request: Request, fn, *args):
+    # Solvers and simulations run on the warm process pool so they never stall the event loop
+    try:
+        return await compute_pool.run(fn, *args, disconnected=wait_for_disconnect(request))
+    except ComputePoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    except ComputeDeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Computation took too long")
+    except ComputeCancelled:
+        # Nobody is listening any more; 499 is the conventional "client closed request"
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except (UnknownAsset, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/portfolio/optimize")
-async def optimize_portfolio(optimization: PortfolioOptimization):
-    result = generate_portfolio_optimization(
+async def optimize_portfolio(optimization: PortfolioOptimization, request: Request):
+    result = await run_compute_job(
+        request,
+        optimize_portfolio_job,
         optimization.riskLevel,
         optimization.amount,
         optimization.preferences
     )
+    # The worker's prices are from when it started; quote the live ones
+    for recommendation in result["recommendations"]:
+        recommendation["currentPrice"] = market_data.price(recommendation["symbol"])
     
     return {
         "message": "Portfolio optimized successfully",
@@ -470,45 +517,113 @@ async def optimize_portfolio(optimization: PortfolioOptimization):
     }
 
 @app.post("/api/portfolio/simulate")
-async def simulate_portfolio(simulation: PortfolioSimulation):
-    # Portfolio simulation logic (unchanged)
+async def simulate_portfolio(simulation: PortfolioSimulation, request: Request):
     total_allocation = sum(simulation.allocation.values())
     if abs(total_allocation - 1.0) > 0.01:
         raise HTTPException(status_code=400, detail="Allocation must sum to 100%")
+    if any(weight < 0 for weight in simulation.allocation.values()):
+        raise HTTPException(status_code=400, detail="Allocation weights must not be negative")
     
-    # Simulate returns
-    simulated_value = 10000  # Starting value
-    monthly_return = 0.008  # 0.8% monthly return
-    
-    for month in range(simulation.timeframe):
-        simulated_value *= (1 + monthly_return)
+    result = await run_compute_job(
+        request,
+        simulate_portfolio_job,
+        simulation.allocation,
+        simulation.timeframe,
+        simulation.initialValue,
+        simulation.paths or SIMULATION_PATHS,
+        simulation.seed
+    )
     
     return {
         "message": "Portfolio simulation completed",
         "data": {
-            "initialValue": 10000,
-            "finalValue": round(simulated_value, 2),
-            "totalReturn": round(((simulated_value - 10000) / 10000) * 100, 2),
+            "initialValue": simulation.initialValue,
+            "finalValue": result["expectedFinalValue"],
+            "totalReturn": round((result["expectedFinalValue"] / simulation.initialValue - 1) * 100, 2),
             "timeframe": simulation.timeframe,
-            "allocation": simulation.allocation
+            "allocation": simulation.allocation,
+            **result
         }
     }
 
 # ==================== STOCK ENDPOINTS ====================
 
 @app.get("/api/stocks/prices")
-async def get_stock_prices():
-    return {
-        "message": "Stock prices retrieved successfully",
-        "data": STOCK_PRICES
-    }
+async def get_stock_prices(request: Request):
+    # Served from a pre-encoded snapshot that only changes when prices do
+    return price_feed.respond(request)
+
+def parse_symbols(symbols: Optional[str]) -> Optional[List[str]]:
+    return [symbol.strip().upper() for symbol in (symbols or "").split(",") if symbol.strip()] or None
+
+@app.get("/api/stocks/stream")
+async def stream_stock_prices(symbols: Optional[str] = None):
+    """Server-Sent Events with a snapshot, then only the ticks that changed (?symbols=AAPL,TSLA)"""
+    symbol_list = parse_symbols(symbols)
+    # Validate up front so bad symbols still get a 404/400 rather than an empty stream
+    try:
+        price_hub.subscription_key(symbol_list)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Stock not found: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def events():
+        # Subscribe only once the response is being sent, so a client that is gone before
+        # the first iteration never leaves a subscription behind
+        subscription = price_hub.subscribe(symbol_list)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.next_message(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield message.sse
+        finally:
+            price_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/api/stocks/stream/ws")
+async def stream_stock_prices_ws(websocket: WebSocket, symbols: Optional[str] = None):
+    """WebSocket variant of /api/stocks/stream"""
+    await websocket.accept()
+    try:
+        subscription = price_hub.subscribe(parse_symbols(symbols))
+    except (KeyError, ValueError) as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    
+    async def send_ticks():
+        while True:
+            message = await subscription.next_message()
+            await websocket.send_text(message.text)
+    
+    async def wait_for_close():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    tasks = [asyncio.create_task(send_ticks()), asyncio.create_task(wait_for_close())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        price_hub.unsubscribe(subscription)
 
 @app.get("/api/stocks/{symbol}")
 async def get_stock_data(symbol: str):
-    if symbol.upper() not in STOCK_PRICES:
+    stock_data = market_data.get(symbol)
+    if stock_data is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     
-    stock_data = STOCK_PRICES[symbol.upper()].copy()
     stock_data["symbol"] = symbol.upper()
     
     # Add additional data
@@ -526,7 +641,8 @@ async def get_stock_data(symbol: str):
 
 @app.post("/api/stocks/swipe")
 async def swipe_stock(swipe: StockSwipe):
-    if swipe.symbol.upper() not in STOCK_PRICES:
+    price = market_data.price(swipe.symbol)
+    if price is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     
     action = "invest" if swipe.direction == "right" else "pass"
@@ -546,7 +662,7 @@ async def swipe_stock(swipe: StockSwipe):
                 "symbol": swipe.symbol.upper(),
                 "shares": 5 if swipe.direction == "right" else 0,
                 "amount": 1000 if swipe.direction == "right" else 0,
-                "price": STOCK_PRICES[swipe.symbol.upper()]["price"]
+                "price": price
             } if swipe.direction == "right" else None
         }
     }
@@ -559,14 +675,17 @@ async def follow_user(follow_data: FollowUser, current_user: dict = Depends(get_
     if follows_collection is None:
         raise HTTPException(status_code=503, detail="Database not available")
     
-    # Follow logic (simplified)
     follow_record = {
         "followerId": current_user.get("userId"),
         "targetUserId": follow_data.targetUserId,
         "createdAt": get_current_timestamp()
     }
     
-    await follows_collection.insert_one(follow_record)
+    # Unique (followerId, targetUserId) index makes re-following a no-op
+    try:
+        await follows_collection.insert_one(follow_record)
+    except DuplicateKeyError:
+        pass
     
     return {
         "message": "User followed successfully",
@@ -594,34 +713,19 @@ async def unfollow_user(follow_data: FollowUser, current_user: dict = Depends(ge
 
 @app.post("/api/chat")
 async def chat(chat_data: ChatMessage):
-    chat_sessions_collection = get_chat_sessions_collection()
-    if chat_sessions_collection is None:
-        raise HTTPException(status_code=503, detail="Database not available")
-    
     session = chat_data.sessionId or generate_id()
     
-    # Get or create chat session
-    session_data = await chat_sessions_collection.find_one({"id": session})
-    if not session_data:
-        session_data = {
-            "id": session,
-            "messages": [],
-            "createdAt": get_current_timestamp(),
-        }
-        await chat_sessions_collection.insert_one(session_data)
-    
-    response = generate_chat_response(chat_data.message)
-    
-    # Add messages to session
-    new_messages = [
-        {"role": "user", "content": chat_data.message, "timestamp": get_current_timestamp()},
-        {"role": "assistant", "content": response, "timestamp": get_current_timestamp()},
-    ]
-    
-    await chat_sessions_collection.update_one(
-        {"id": session},
-        {"$push": {"messages": {"$each": new_messages}}}
-    )
+    try:
+        context = await chat_history.recent_context(session) if chat_data.sessionId else []
+        response = await chat_responder.complete(chat_data.message, context)
+        
+        new_messages = [
+            {"role": "user", "content": chat_data.message, "timestamp": get_current_timestamp()},
+            {"role": "assistant", "content": response, "timestamp": get_current_timestamp()},
+        ]
+        await chat_history.append(session, new_messages)
+    except ChatHistoryUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     return {
         "message": "Chat response generated",
@@ -631,6 +735,59 @@ async def chat(chat_data: ChatMessage):
         }
     }
 
+def sse_event(data: Dict[str, Any], event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.post("/api/chat/stream")
+async def chat_stream(chat_data: ChatMessage):
+    """Stream the chat reply as Server-Sent Events, token by token"""
+    session = chat_data.sessionId or generate_id()
+    
+    try:
+        context = await chat_history.recent_context(session) if chat_data.sessionId else []
+    except ChatHistoryUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def events():
+        user_message = {"role": "user", "content": chat_data.message, "timestamp": get_current_timestamp()}
+        yield sse_event({"sessionId": session}, event="session")
+        try:
+            async for chunk in chat_responder.stream(chat_data.message, context):
+                if "token" in chunk:
+                    yield sse_event({"token": chunk["token"]})
+                    continue
+                
+                await chat_history.append(session, [
+                    user_message,
+                    {"role": "assistant", "content": chunk["response"], "timestamp": get_current_timestamp()}
+                ])
+                yield sse_event({"response": chunk["response"], "cached": chunk["cached"]}, event="done")
+        except Exception as e:
+            print(f"❌ Chat stream failed: {e}")
+            yield sse_event({"detail": "Chat response failed"}, event="error")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/chat/{session_id}/history")
+async def get_chat_history(session_id: str, before: Optional[int] = None, limit: int = CHAT_HISTORY_PAGE_SIZE):
+    """Get a page of chat history; pass `next` back as `before` for older messages"""
+    try:
+        page = await chat_history.history(session_id, before=before, limit=limit)
+    except ChatHistoryUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    
+    return {
+        "message": "Chat history retrieved successfully",
+        "data": page
+    }
+
 # ==================== ANALYTICS ENDPOINTS ====================
 
 @app.post("/api/analytics/track")
@@ -640,17 +797,22 @@ async def track_analytics(event: AnalyticsEvent):
         # Analytics is optional, don't fail the request
         return {"message": "Analytics tracking skipped - database not available"}
     
-    analytics_event = AnalyticsModel(
-        eventType=event.eventType,
-        page=event.page,
-        sessionId=event.sessionId,
-        timestamp=event.timestamp,
-        userAgent=event.userAgent,
-        location=event.location,
-        element=event.element,
-        value=event.value,
-        referrer=event.referrer
-    )
+    analytics_event = build_analytics_model(event)
+    
+    if analytics_buffer.running:
+        # Write-behind mode: respond without waiting for MongoDB
+        try:
+            queued = analytics_buffer.enqueue(analytics_event.dict(by_alias=True))
+        except AnalyticsBufferFull:
+            raise HTTPException(status_code=429, detail="Analytics buffer full, retry later")
+        if not queued:
+            return {"message": "Analytics event dropped - buffer full"}
+        return {
+            "message": "Analytics event queued successfully",
+            "data": {
+                "eventId": str(analytics_event.id)
+            }
+        }
     
     await analytics_collection.insert_one(analytics_event.dict(by_alias=True))
     
@@ -661,6 +823,66 @@ async def track_analytics(event: AnalyticsEvent):
         }
     }
 
+@app.post("/api/analytics/batch")
+async def track_analytics_batch(events: List[Any] = Body(...)):
+    """Track many analytics events with a single insert_many"""
+    if len(events) > MAX_ANALYTICS_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_ANALYTICS_BATCH_SIZE} events)"
+        )
+    
+    analytics_collection = get_analytics_collection()
+    if analytics_collection is None:
+        # Analytics is optional, don't fail the request
+        return {"message": "Analytics tracking skipped - database not available"}
+    
+    # Validate every event up front; invalid ones are reported, not written
+    results: List[Dict[str, Any]] = [None] * len(events)
+    documents = []
+    document_indexes = []
+    for index, raw_event in enumerate(events):
+        if not isinstance(raw_event, dict):
+            results[index] = {"index": index, "error": "Event must be an object"}
+            continue
+        try:
+            analytics_event = build_analytics_model(AnalyticsEvent(**raw_event))
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+            results[index] = {"index": index, "error": "; ".join(errors)}
+            continue
+        documents.append(analytics_event.dict(by_alias=True))
+        document_indexes.append(index)
+        results[index] = {"index": index, "eventId": str(analytics_event.id)}
+    
+    if documents and analytics_buffer.running:
+        try:
+            queued = analytics_buffer.enqueue_many(documents)
+        except AnalyticsBufferFull:
+            raise HTTPException(status_code=429, detail="Analytics buffer full, retry later")
+        # Events past the accepted prefix were dropped by the buffer
+        for index in document_indexes[queued:]:
+            results[index] = {"index": index, "error": "Dropped - analytics buffer full"}
+    elif documents:
+        try:
+            await analytics_collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Unordered insert keeps going; mark only the events that failed
+            for write_error in e.details.get("writeErrors", []):
+                index = document_indexes[write_error["index"]]
+                results[index] = {"index": index, "error": write_error.get("errmsg", "Write failed")}
+    
+    tracked = sum(1 for result in results if "eventId" in result)
+    
+    return {
+        "message": f"Tracked {tracked} of {len(events)} analytics events",
+        "data": {
+            "tracked": tracked,
+            "failed": len(events) - tracked,
+            "results": results
+        }
+    }
+
 # ==================== CONTACT ENDPOINTS ====================
 
 @app.post("/api/contact")
@@ -681,8 +903,8 @@ async def send_contact_message(contact: ContactMessage):
     
     # Sync to Google Sheets only in production
     if os.getenv("ENVIRONMENT") == "production":
-        print(f"🔄 Attempting to sync contact message to Google Sheets...")
-        asyncio.create_task(sheets_manager.sync_contact_messages())
+        print(f"🔄 Scheduling contact messages sync to Google Sheets...")
+        sheets_sync_scheduler.request_sync("contact_messages")
     
     return {
         "message": "Message sent successfully",
@@ -714,8 +936,8 @@ async def submit_job_application(application: JobApplication):
     
     # Sync to Google Sheets only in production
     if os.getenv("ENVIRONMENT") == "production":
-        print(f"🔄 Attempting to sync job application to Google Sheets...")
-        asyncio.create_task(sheets_manager.sync_job_applications())
+        print(f"🔄 Scheduling job applications sync to Google Sheets...")
+        sheets_sync_scheduler.request_sync("job_applications")
     
     return {
         "message": "Job application submitted successfully",
@@ -727,100 +949,156 @@ async def submit_job_application(application: JobApplication):
 # ==================== ADMIN ENDPOINTS ====================
 
 @app.get("/api/admin/stats")
-async def get_admin_stats():
+async def get_admin_stats(exact: bool = False):
     """Get admin dashboard statistics"""
     try:
-        waitlist_collection = get_waitlist_collection()
-        contact_messages_collection = get_contact_messages_collection()
-        job_applications_collection = get_job_applications_collection()
-        users_collection = get_users_collection()
-        
-        if any(col is None for col in [waitlist_collection, contact_messages_collection, job_applications_collection, users_collection]):
-            raise HTTPException(status_code=503, detail="Database not available")
-        
-        waitlist_count = await waitlist_collection.count_documents({})
-        contact_count = await contact_messages_collection.count_documents({})
-        applications_count = await job_applications_collection.count_documents({})
-        users_count = await users_collection.count_documents({})
+        counts = await admin_stats.counts(exact=exact)
         
         return {
             "message": "Admin stats retrieved successfully",
-            "data": {
-                "waitlist": waitlist_count,
-                "contacts": contact_count,
-                "applications": applications_count,
-                "users": users_count
-            }
+            "data": counts
         }
+    except StatsUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get admin stats: {str(e)}")
 
+@app.get("/api/admin/overview")
+async def get_admin_overview():
+    """Get counts, status breakdowns and recent items for the dashboard"""
+    try:
+        overview = await admin_stats.overview()
+        
+        return {
+            "message": "Admin overview retrieved successfully",
+            "data": overview
+        }
+    except StatsUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get admin overview: {str(e)}")
+
+# Fields returned by the admin list endpoints (override with ?fields=a,b)
+WAITLIST_LIST_FIELDS = ["email", "name", "interests", "position", "joinedAt", "referrals", "status"]
+CONTACT_LIST_FIELDS = ["name", "email", "message", "status", "createdAt"]
+APPLICATION_LIST_FIELDS = ["position", "name", "email", "phone", "coverLetter", "resumeUrl", "status", "createdAt"]
+
 @app.get("/api/admin/waitlist")
-async def get_waitlist_data():
-    """Get all waitlist entries"""
+async def get_waitlist_data(limit: int = ADMIN_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get a page of waitlist entries, newest first"""
     try:
         waitlist_collection = get_waitlist_collection()
         if waitlist_collection is None:
             raise HTTPException(status_code=503, detail="Database not available")
-            
-        cursor = waitlist_collection.find({}).sort("joinedAt", -1)
-        waitlist_data = await cursor.to_list(length=None)
         
-        # Convert ObjectId to string for JSON serialization
-        for entry in waitlist_data:
-            entry["_id"] = str(entry["_id"])
+        page = await fetch_page(
+            waitlist_collection, "joinedAt", select_fields(WAITLIST_LIST_FIELDS, fields), limit, cursor
+        )
         
         return {
             "message": "Waitlist data retrieved successfully",
-            "data": waitlist_data
+            "data": page["items"],
+            "next": page["next"],
+            "limit": page["limit"]
         }
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get waitlist data: {str(e)}")
 
 @app.get("/api/admin/contacts")
-async def get_contact_messages():
-    """Get all contact messages"""
+async def get_contact_messages(limit: int = ADMIN_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get a page of contact messages, newest first"""
     try:
         contact_messages_collection = get_contact_messages_collection()
         if contact_messages_collection is None:
             raise HTTPException(status_code=503, detail="Database not available")
-            
-        cursor = contact_messages_collection.find({}).sort("createdAt", -1)
-        messages_data = await cursor.to_list(length=None)
         
-        # Convert ObjectId to string for JSON serialization
-        for message in messages_data:
-            message["_id"] = str(message["_id"])
+        page = await fetch_page(
+            contact_messages_collection, "createdAt", select_fields(CONTACT_LIST_FIELDS, fields), limit, cursor
+        )
         
         return {
             "message": "Contact messages retrieved successfully",
-            "data": messages_data
+            "data": page["items"],
+            "next": page["next"],
+            "limit": page["limit"]
         }
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get contact messages: {str(e)}")
 
 @app.get("/api/admin/applications")
-async def get_job_applications():
-    """Get all job applications"""
+async def get_job_applications(limit: int = ADMIN_PAGE_SIZE, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """Get a page of job applications, newest first"""
     try:
         job_applications_collection = get_job_applications_collection()
         if job_applications_collection is None:
             raise HTTPException(status_code=503, detail="Database not available")
-            
-        cursor = job_applications_collection.find({}).sort("createdAt", -1)
-        applications_data = await cursor.to_list(length=None)
         
-        # Convert ObjectId to string for JSON serialization
-        for app in applications_data:
-            app["_id"] = str(app["_id"])
+        page = await fetch_page(
+            job_applications_collection, "createdAt", select_fields(APPLICATION_LIST_FIELDS, fields), limit, cursor
+        )
         
         return {
             "message": "Job applications retrieved successfully",
-            "data": applications_data
+            "data": page["items"],
+            "next": page["next"],
+            "limit": page["limit"]
         }
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get job applications: {str(e)}")
 
+@app.get("/api/admin/export/{collection_key}")
+async def export_admin_collection(collection_key: str, format: str = "ndjson", gzip: bool = False):
+    """Stream a whole admin collection as NDJSON or CSV, optionally gzipped"""
+    if collection_key not in EXPORT_SPECS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {collection_key}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if EXPORT_SPECS[collection_key]["collection"]() is None:
+        raise HTTPException(status_code=503, detail="Database not available")
+    
+    filename = f"{collection_key}.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        export_stream(collection_key, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/api/admin/metrics")
+async def get_admin_metrics():
+    """Get in-process runtime metrics"""
+    return {
+        "message": "Metrics retrieved successfully",
+        "data": {
+            "analyticsBuffer": analytics_buffer.stats(),
+            "sheetsSync": sheets_sync_scheduler.stats(),
+            "sheetsApi": sheets_request_scheduler.stats(),
+            "passwordHashing": password_hasher.stats(),
+            "idempotency": idempotency_cache.stats(),
+            "adminStats": admin_stats.stats(),
+            "chat": chat_responder.stats(),
+            "priceFeed": price_feed.stats(),
+            "priceStream": price_hub.stats(),
+            "computePool": compute_pool.stats()
+        }
+    }
+
 @app.post("/api/admin/sync-sheets")
 async def sync_to_google_sheets():
     """Manually trigger Google Sheets sync"""
@@ -836,6 +1114,21 @@ async def sync_to_google_sheets():
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
 
+@app.post("/api/admin/rebuild-sheets")
+async def rebuild_google_sheets():
+    """Rewrite every sheet from scratch and reset the incremental sync watermarks"""
+    try:
+        success = await sheets_manager.sync_all_data(incremental=False)
+        if success:
+            return {"message": "Google Sheets rebuilt successfully"}
+        else:
+            raise HTTPException(status_code=500, detail="Failed to rebuild Google Sheets")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Rebuild error details: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Rebuild failed: {str(e)}")
+
 # ==================== HEALTH CHECK ENDPOINTS ====================
 
 @app.get("/api/health")
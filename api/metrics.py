@@ -0,0 +1,21 @@
+"""
+Latency summaries shared by the worker pools and backends behind /api/admin/metrics
+"""
+
+from typing import Any, Dict
+
+# Recent samples each rolling latency window keeps
+METRICS_WINDOW = 1000
+
+def summarize(samples) -> Dict[str, Any]:
+    """Count, average and percentiles in milliseconds for samples in seconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avgMs": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50Ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95Ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "maxMs": round(ordered[-1] * 1000, 2)
+    }
@@ -0,0 +1,34 @@
+"""
+One-off migration: move legacy chat_sessions.messages arrays into chat_messages buckets
+
+Run before deploying the bucketed chat history, while no old-format appends are happening.
+"""
+
+import asyncio
+from database import get_chat_sessions_collection, init_database
+from chat_history import chat_history
+
+async def run_migration():
+    """Bucket every session that still has an embedded messages array"""
+    print("💬 Migrating chat sessions to bucketed history...")
+    
+    try:
+        await init_database()
+        sessions_collection = get_chat_sessions_collection()
+        if sessions_collection is None:
+            raise Exception("Database not available")
+        
+        sessions = messages = 0
+        cursor = sessions_collection.find({"messages": {"$exists": True}}, projection={"id": 1, "messages": 1})
+        async for session in cursor:
+            messages += await chat_history.migrate_legacy_session(session)
+            sessions += 1
+        
+        print(f"✅ Migrated {sessions} chat sessions ({messages} messages)")
+        return True
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
@@ -0,0 +1,74 @@
+"""
+Keyset (cursor) pagination for admin list endpoints
+"""
+
+import os
+import json
+import base64
+from typing import Dict, Any, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+ADMIN_MAX_PAGE_SIZE = int(os.getenv("ADMIN_MAX_PAGE_SIZE", "200"))
+
+class InvalidCursor(Exception):
+    """Raised when a client sends a cursor we did not issue"""
+
+def encode_cursor(sort_value: Any, last_id: Any) -> str:
+    """Opaque cursor pointing just past (sort_value, _id)"""
+    raw = json.dumps([sort_value, str(last_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, last_id = json.loads(raw)
+        return sort_value, ObjectId(last_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+def select_fields(allowed: List[str], fields: Optional[str]) -> List[str]:
+    """Restrict the projection to the requested comma-separated fields"""
+    if not fields:
+        return allowed
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    return [field for field in allowed if field in requested] or allowed
+
+async def fetch_page(
+    collection,
+    sort_field: str,
+    fields: List[str],
+    limit: int = ADMIN_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Newest-first page ordered by (sort_field, _id), served by the matching compound index"""
+    limit = max(1, min(limit, ADMIN_MAX_PAGE_SIZE))
+
+    query = {}
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        # The $lte bound keeps the index scan tight; $or breaks ties on _id
+        query = {
+            sort_field: {"$lte": sort_value},
+            "$or": [{sort_field: {"$lt": sort_value}}, {"_id": {"$lt": last_id}}]
+        }
+
+    projection = {field: 1 for field in fields}
+    projection[sort_field] = 1
+    # Fetch one extra document to know whether another page exists
+    documents = await collection.find(query, projection).sort(
+        [(sort_field, -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = None
+    if has_more:
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+
+    for document in documents:
+        document["_id"] = str(document["_id"])
+
+    return {"items": documents, "next": next_cursor, "limit": limit}
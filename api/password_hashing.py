@@ -0,0 +1,80 @@
+"""
+Bounded worker pool for bcrypt hashing/verification, kept off the event loop
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from metrics import summarize, METRICS_WINDOW
+
+# bcrypt releases the GIL while hashing, so threads run hashes in parallel
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+class PasswordHasherSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+class PasswordHasherPool:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        # Rolling windows of recent samples, in seconds
+        self.hash_times = deque(maxlen=METRICS_WINDOW)
+        self.queue_waits = deque(maxlen=METRICS_WINDOW)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) on a worker, or fail fast if the pool is saturated"""
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherSaturated("Password hashing pool is saturated")
+
+        submitted_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            result = fn(*args)
+            return result, started_at, time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(job)
+        self.in_flight += 1
+        # The worker stays counted until its thread is really done, even if the caller gives up
+        future.add_done_callback(lambda done: loop.call_soon_threadsafe(self._finish, submitted_at, done))
+
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _finish(self, submitted_at: float, future: Future):
+        self.in_flight -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        _, started_at, finished_at = future.result()
+        self.completed += 1
+        self.queue_waits.append(started_at - submitted_at)
+        self.hash_times.append(finished_at - started_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "queueDepth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hashLatency": summarize(self.hash_times),
+            "queueWait": summarize(self.queue_waits)
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+# Global instance
+password_hasher = PasswordHasherPool()
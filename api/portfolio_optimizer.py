@@ -0,0 +1,300 @@
+"""
+Long-only mean-variance portfolio optimization with a cached efficient frontier
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Tuple, Optional, Callable
+import numpy as np
+from market_data import market_data
+from risk_model import get_risk_model, RiskModel, UnknownAsset, RISK_FREE_RATE
+
+# Largest weight any single stock may get
+PORTFOLIO_MAX_POSITION = float(os.getenv("PORTFOLIO_MAX_POSITION", "0.35"))
+PORTFOLIO_FRONTIER_POINTS = int(os.getenv("PORTFOLIO_FRONTIER_POINTS", "24"))
+# Frontiers kept per risk model (one per distinct set of preferences)
+PORTFOLIO_FRONTIER_CACHE_SIZE = int(os.getenv("PORTFOLIO_FRONTIER_CACHE_SIZE", "64"))
+PORTFOLIO_SOLVER_ITERATIONS = int(os.getenv("PORTFOLIO_SOLVER_ITERATIONS", "1000"))
+# Solver iterations between checkpoint calls
+PORTFOLIO_CHECKPOINT_ITERATIONS = 25
+PORTFOLIO_REBALANCE_DAYS = 90
+# Weights below this are left out of the recommendations
+MIN_RECOMMENDED_WEIGHT = 0.005
+
+# Annualized volatility each risk level targets on the frontier
+RISK_LEVEL_VOLATILITY = {
+    "conservative": 0.06,
+    "moderate": 0.11,
+    "aggressive": 0.18,
+}
+DEFAULT_RISK_LEVEL = "moderate"
+# Asset classes the optimizer may hold next to individual stocks
+OPTIMIZER_ASSET_CLASSES = ("bonds", "cash")
+
+def project_capped_simplex(
+    values: np.ndarray,
+    caps: np.ndarray,
+    scales: np.ndarray,
+    tau: Optional[np.ndarray] = None,
+    iterations: int = 60
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Project each row onto {w : sum(w) = 1, 0 <= w <= caps} in the norm weighted by 1 / scales
+
+    The solution is clip(v - tau * scales, 0, caps), whose sum is piecewise linear and
+    decreasing in tau. tau is found by Newton steps kept inside a shrinking bracket
+    (exact once a step lands on the right segment). Passing the previous tau back in,
+    as the solver does, usually makes that a single step. Returns (weights, tau).
+    """
+    low = ((values - caps) / scales).min(axis=1)
+    high = (values / scales).max(axis=1)
+    tau = (low + high) / 2 if tau is None else np.clip(tau, low, high)
+    for _ in range(iterations):
+        shifted = values - tau[:, None] * scales
+        excess = np.clip(shifted, 0, caps).sum(axis=1) - 1
+        if np.abs(excess).max() < 1e-12:
+            break
+        low = np.where(excess > 0, tau, low)
+        high = np.where(excess < 0, tau, high)
+        slope = (((shifted > 0) & (shifted < caps)) * scales).sum(axis=1)
+        step = tau + excess / np.maximum(slope, 1e-300)
+        tau = np.where((slope > 0) & (step > low) & (step < high), step, (low + high) / 2)
+    return np.clip(values - tau[:, None] * scales, 0, caps), tau
+
+def portfolio_variances(weights: np.ndarray, loadings: np.ndarray, residual_variances: np.ndarray) -> np.ndarray:
+    """w'Sigma w for each row of weights, straight from the factor form"""
+    return (weights @ loadings) ** 2 + (weights * weights) @ residual_variances
+
+def max_correlation_eigenvalue(loadings: np.ndarray, residual_variances: np.ndarray, iterations: int = 100) -> float:
+    """Largest eigenvalue of the correlation matrix of a single-factor covariance
+
+    The correlation matrix is diag(d) + u u', so its largest eigenvalue is the root
+    of sum(u^2 / (x - d)) = 1 above max(d) (found by bisection in O(n)).
+    """
+    variances = loadings ** 2 + residual_variances
+    u2 = loadings ** 2 / variances
+    d = residual_variances / variances
+    exposed = u2 > 0
+    if not exposed.any():
+        return float(d.max())
+    low = d[exposed].max()
+    high = low + u2.sum()
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if (u2[exposed] / (middle - d[exposed])).sum() > 1:
+            low = middle
+        else:
+            high = middle
+    return float(max(high, d.max()))
+
+def solve_frontier(
+    expected_returns: np.ndarray,
+    loadings: np.ndarray,
+    residual_variances: np.ndarray,
+    caps: np.ndarray,
+    risk_aversions: np.ndarray,
+    iterations: int = PORTFOLIO_SOLVER_ITERATIONS,
+    tolerance: float = 1e-7,
+    checkpoint: Optional[Callable[[], None]] = None
+) -> np.ndarray:
+    """Maximize w'mu - (lambda / 2) w'Sigma w for every lambda at once
+
+    Accelerated projected gradient, preconditioned by the variances: cash and
+    volatile stocks differ in variance by four orders of magnitude, which makes
+    plain gradient steps crawl. Sigma is only ever applied in factor form, so
+    each iteration is O(n) per frontier point. Returns one row of weights per
+    risk aversion. `checkpoint` is called every few iterations and may raise to
+    abandon the solve.
+    """
+    scales = 1 / (loadings ** 2 + residual_variances)
+    steps = 1 / (risk_aversions * max_correlation_eigenvalue(loadings, residual_variances))
+    weights, tau = project_capped_simplex(np.tile(caps / caps.sum(), (len(risk_aversions), 1)), caps, scales)
+    momentum = weights
+    t = 1.0
+    for iteration in range(iterations):
+        if checkpoint is not None and iteration % PORTFOLIO_CHECKPOINT_ITERATIONS == 0:
+            checkpoint()
+        covariance_product = (momentum @ loadings)[:, None] * loadings + momentum * residual_variances
+        gradient = risk_aversions[:, None] * covariance_product - expected_returns
+        updated, tau = project_capped_simplex(momentum - steps[:, None] * gradient * scales, caps, scales, tau)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next) * (updated - weights)
+        converged = np.abs(updated - weights).max() < tolerance
+        weights, t = updated, t_next
+        if converged:
+            break
+    return weights
+
+class EfficientFrontier:
+    """Frontier portfolios sorted by volatility, for one risk model and set of constraints"""
+
+    def __init__(self, model: RiskModel, rows: np.ndarray, weights: np.ndarray):
+        self.model = model
+        self.rows = rows
+        self.loadings, self.residual_variances = model.factors(rows)
+        self.expected_returns = model.expected_returns[rows]
+        volatilities = np.sqrt(portfolio_variances(weights, self.loadings, self.residual_variances))
+        order = np.argsort(volatilities)
+        self.weights = weights[order]
+        self.returns = self.weights @ self.expected_returns
+        self.volatilities = volatilities[order]
+
+    def variance(self, weights: np.ndarray) -> float:
+        return float(portfolio_variances(weights[None, :], self.loadings, self.residual_variances)[0])
+
+    def portfolio(self, target_volatility: float) -> Tuple[np.ndarray, float, float]:
+        """(weights, expected return, volatility) of the frontier portfolio at a target volatility
+
+        Between two computed points the weights are mixed so the volatility hits the
+        target exactly; the mix satisfies the same constraints as both ends.
+        """
+        above = int(np.searchsorted(self.volatilities, target_volatility))
+        if above == 0 or above == len(self.volatilities):
+            weights = self.weights[min(above, len(self.weights) - 1)]
+        else:
+            # Solve vol(lower + a * step)^2 = target^2, a quadratic a2 a^2 + a1 a + a0 = 0, for a in [0, 1]
+            lower = self.weights[above - 1]
+            step = self.weights[above] - lower
+            a2 = self.variance(step)
+            a1 = self.variance(lower + step) - self.variance(lower) - a2
+            a0 = self.variance(lower) - target_volatility ** 2
+            mix = (-a1 + np.sqrt(max(a1 * a1 - 4 * a2 * a0, 0.0))) / (2 * a2) if a2 > 0 else 0.0
+            weights = lower + min(max(mix, 0.0), 1.0) * step
+        return weights, float(weights @ self.expected_returns), float(np.sqrt(self.variance(weights)))
+
+def parse_preferences(preferences: Optional[Dict]) -> Tuple[Tuple[str, ...], float]:
+    """(exclude, max_position) from optimize preferences; raises ValueError for bad types or values"""
+    preferences = preferences or {}
+    exclude = preferences.get("exclude")
+    if exclude is None:
+        exclude = ()
+    elif isinstance(exclude, str):
+        exclude = (exclude,)
+    elif not isinstance(exclude, list) or not all(isinstance(symbol, str) for symbol in exclude):
+        raise ValueError("exclude must be a list of symbols")
+
+    max_position = preferences.get("maxPosition", PORTFOLIO_MAX_POSITION)
+    # bool is an int subclass, but `true` is not a position size
+    if isinstance(max_position, bool) or not isinstance(max_position, (int, float)):
+        raise ValueError("maxPosition must be a number")
+    if not 0 < max_position <= 1:
+        raise ValueError("maxPosition must be between 0 and 1")
+    return tuple(exclude), float(max_position)
+
+class PortfolioOptimizer:
+    def __init__(self):
+        self.frontiers: "OrderedDict[Tuple, EfficientFrontier]" = OrderedDict()
+        self.model: Optional[RiskModel] = None
+        self.requests = 0
+        self.builds = 0
+        self.last_build_ms = 0.0
+
+    def frontier(
+        self,
+        exclude: Iterable[str] = (),
+        max_position: float = PORTFOLIO_MAX_POSITION,
+        checkpoint: Optional[Callable[[], None]] = None
+    ) -> EfficientFrontier:
+        """Cached frontier for the current risk model; raises UnknownAsset or ValueError
+
+        Price updates leave the risk model, and so every cached frontier, in place.
+        """
+        model = get_risk_model()
+        if model is not self.model:
+            self.frontiers.clear()
+            self.model = model
+
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        excluded = tuple(sorted({symbol.upper() for symbol in exclude}))
+        key = (excluded, max_position)
+        frontier = self.frontiers.get(key)
+        if frontier is not None:
+            self.frontiers.move_to_end(key)
+            return frontier
+
+        started_at = time.perf_counter()
+        unknown = [symbol for symbol in excluded if symbol not in market_data]
+        if unknown:
+            raise UnknownAsset(f"Unknown asset: {unknown[0]}")
+        symbols = [symbol for symbol in market_data.symbols if symbol not in excluded]
+        rows = model.rows(symbols + list(OPTIMIZER_ASSET_CLASSES))
+        caps = np.array([max_position] * len(symbols) + [1.0] * len(OPTIMIZER_ASSET_CLASSES))
+        risk_aversions = np.geomspace(0.5, 500, PORTFOLIO_FRONTIER_POINTS)
+        loadings, residual_variances = model.factors(rows)
+        weights = solve_frontier(
+            model.expected_returns[rows], loadings, residual_variances, caps, risk_aversions, checkpoint=checkpoint
+        )
+        frontier = EfficientFrontier(model, rows, weights)
+
+        self.frontiers[key] = frontier
+        if len(self.frontiers) > PORTFOLIO_FRONTIER_CACHE_SIZE:
+            self.frontiers.popitem(last=False)
+        self.builds += 1
+        self.last_build_ms = (time.perf_counter() - started_at) * 1000
+        return frontier
+
+    def optimize(
+        self,
+        risk_level: str,
+        investment_amount: float,
+        preferences: Dict = None,
+        checkpoint: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """Frontier portfolio for a risk level
+
+        Supported preferences: `exclude` (symbols to leave out) and `maxPosition`
+        (largest weight for a single stock).
+        """
+        self.requests += 1
+        risk_level = risk_level if risk_level in RISK_LEVEL_VOLATILITY else DEFAULT_RISK_LEVEL
+        exclude, max_position = parse_preferences(preferences)
+
+        frontier = self.frontier(exclude, max_position, checkpoint)
+        weights, expected_return, volatility = frontier.portfolio(RISK_LEVEL_VOLATILITY[risk_level])
+        model = frontier.model
+
+        allocations = {"stocks": 0.0, "bonds": 0.0, "cash": 0.0}
+        recommendations = []
+        for row, weight in sorted(zip(frontier.rows.tolist(), weights.tolist()), key=lambda item: -item[1]):
+            asset = model.assets[row]
+            if asset in allocations:
+                allocations[asset] += weight
+                continue
+            allocations["stocks"] += weight
+            if weight < MIN_RECOMMENDED_WEIGHT:
+                continue
+            recommendations.append({
+                "symbol": asset,
+                "allocation": f"{weight * 100:.1f}",
+                "amount": str(round(investment_amount * weight, 2)),
+                "currentPrice": market_data.price(asset),
+                "expectedReturn": f"{model.expected_returns[row] * 100:.1f}%"
+            })
+
+        return {
+            "totalValue": investment_amount,
+            "riskLevel": risk_level,
+            "expectedReturn": f"{expected_return * 100:.1f}%",
+            "expectedVolatility": f"{volatility * 100:.1f}%",
+            "sharpeRatio": round((expected_return - RISK_FREE_RATE) / volatility, 2),
+            "riskScore": int(np.clip(round(volatility * 50), 1, 10)),
+            "allocations": {asset: round(weight, 4) for asset, weight in allocations.items()},
+            "recommendations": recommendations,
+            "rebalanceDate": (datetime.now() + timedelta(days=PORTFOLIO_REBALANCE_DAYS)).isoformat(),
+            # 10 * (1 - Herfindahl index): 0 for a single holding, approaching 10 when spread evenly
+            "diversificationScore": round(10 * (1 - float(weights @ weights)), 1)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "universeSize": self.model.universe_size if self.model else 0,
+            "requests": self.requests,
+            "frontierBuilds": self.builds,
+            "cachedFrontiers": len(self.frontiers),
+            "lastBuildMs": round(self.last_build_ms, 2)
+        }
+
+# Global instance
+portfolio_optimizer = PortfolioOptimizer()
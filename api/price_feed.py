@@ -0,0 +1,103 @@
+"""
+Pre-serialized /api/stocks/prices responses with gzip variants and strong ETags
+"""
+
+import os
+import json
+import gzip
+import hashlib
+from typing import Dict, Optional
+from fastapi import Request, Response
+from market_data import market_data, MarketDataStore
+
+PRICE_FEED_MAX_AGE = int(os.getenv("PRICE_FEED_MAX_AGE", "1"))
+PRICE_FEED_S_MAXAGE = int(os.getenv("PRICE_FEED_S_MAXAGE", "1"))
+PRICE_FEED_STALE_WHILE_REVALIDATE = int(os.getenv("PRICE_FEED_STALE_WHILE_REVALIDATE", "5"))
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True if gzip is listed in Accept-Encoding without q=0"""
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().lower()
+            if not quality.startswith("q="):
+                return True
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return True
+    return False
+
+def etag_matches(if_none_match: str, etags) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags)
+
+class PriceFeedSnapshot:
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Each representation gets its own strong validator
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+
+class PriceFeed:
+    """Re-encodes the price payload only when market data changes"""
+
+    def __init__(self, store: MarketDataStore = None):
+        self.store = store or market_data
+        self.snapshot: Optional[PriceFeedSnapshot] = None
+        self.rebuilds = 0
+        self.not_modified = 0
+        self.served = 0
+        self.cache_control = (
+            f"public, max-age={PRICE_FEED_MAX_AGE}, s-maxage={PRICE_FEED_S_MAXAGE}, "
+            f"stale-while-revalidate={PRICE_FEED_STALE_WHILE_REVALIDATE}"
+        )
+
+    def current(self) -> PriceFeedSnapshot:
+        if self.snapshot is None or self.snapshot.version != self.store.version:
+            payload = {
+                "message": "Stock prices retrieved successfully",
+                "data": self.store.snapshot()
+            }
+            body = json.dumps(payload, separators=(",", ":")).encode()
+            self.snapshot = PriceFeedSnapshot(self.store.version, body)
+            self.rebuilds += 1
+        return self.snapshot
+
+    def respond(self, request: Request) -> Response:
+        snapshot = self.current()
+        use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = snapshot.gzip_etag if use_gzip else snapshot.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, (snapshot.etag, snapshot.gzip_etag)):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        self.served += 1
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.store.version,
+            "rebuilds": self.rebuilds,
+            "served": self.served,
+            "notModified": self.not_modified
+        }
+
+# Global instance
+price_feed = PriceFeed()
@@ -0,0 +1,226 @@
+"""
+Live price fan-out: subscription groups, one encode per tick per group, bounded per-connection queues
+"""
+
+import os
+import json
+import time
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from market_data import market_data, MarketDataStore
+
+PRICE_STREAM_QUEUE_SIZE = int(os.getenv("PRICE_STREAM_QUEUE_SIZE", "8"))
+PRICE_STREAM_MAX_SYMBOLS = int(os.getenv("PRICE_STREAM_MAX_SYMBOLS", "200"))
+# Simulated tick source, off unless enabled (it moves the prices every endpoint serves)
+PRICE_TICK_SIMULATION = os.getenv("PRICE_TICK_SIMULATION", "false").lower() == "true"
+PRICE_TICK_INTERVAL_MS = int(os.getenv("PRICE_TICK_INTERVAL_MS", "1000"))
+PRICE_TICK_FRACTION = float(os.getenv("PRICE_TICK_FRACTION", "0.2"))
+PRICE_TICK_VOLATILITY = float(os.getenv("PRICE_TICK_VOLATILITY", "0.001"))
+
+class EncodedMessage:
+    """A message encoded once and shared by every connection that receives it"""
+
+    __slots__ = ("text", "sse")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sse = f"data: {text}\n\n"
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "EncodedMessage":
+        return cls(json.dumps(payload, separators=(",", ":")))
+
+class Subscription:
+    """One client connection: a bounded queue that keeps the newest ticks"""
+
+    def __init__(self, group: "SubscriptionGroup", queue_size: int = PRICE_STREAM_QUEUE_SIZE):
+        self.group = group
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.delivered = 0
+        self.dropped = 0
+        # Set after a drop; the next read returns a fresh snapshot instead of stale ticks
+        self.resync = False
+
+    def offer(self, message: EncodedMessage):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.resync = True
+        self.queue.put_nowait(message)
+
+    async def next_message(self) -> EncodedMessage:
+        message = await self.queue.get()
+        if self.resync:
+            # Skip whatever is left and jump straight to current prices
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resync = False
+            message = self.group.snapshot_message()
+        self.delivered += 1
+        return message
+
+class SubscriptionGroup:
+    """All connections subscribed to exactly the same symbol set"""
+
+    def __init__(self, key: Tuple[str, ...], rows: Optional[np.ndarray], store: MarketDataStore):
+        self.key = key
+        self.rows = rows
+        self.store = store
+        self.subscriptions = set()
+        self.snapshot_cache: Optional[Tuple[int, EncodedMessage]] = None
+
+    def snapshot_message(self) -> EncodedMessage:
+        if self.snapshot_cache is None or self.snapshot_cache[0] != self.store.version:
+            payload = {"type": "snapshot", "version": self.store.version, "data": self.store.snapshot(self.rows)}
+            self.snapshot_cache = (self.store.version, EncodedMessage.from_payload(payload))
+        return self.snapshot_cache[1]
+
+class PriceHub:
+    def __init__(self, store: MarketDataStore = None):
+        self.store = store or market_data
+        self.groups: Dict[Tuple[str, ...], SubscriptionGroup] = {}
+        # row -> groups watching it, so a tick only touches the groups it affects
+        self.watchers: Dict[int, set] = {}
+        self.ticks = 0
+        self.messages_encoded = 0
+        self.messages_offered = 0
+        self.closed_dropped = 0
+        self.last_publish_ms = 0.0
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(group.subscriptions) for group in self.groups.values())
+
+    def subscription_key(self, symbols: Optional[List[str]] = None) -> Tuple[str, ...]:
+        """Group key for a symbol list; raises KeyError for unknown symbols, ValueError for too many"""
+        if not symbols:
+            return ("*",)
+        key = tuple(sorted({symbol.upper() for symbol in symbols}))
+        if len(key) > PRICE_STREAM_MAX_SYMBOLS:
+            raise ValueError(f"At most {PRICE_STREAM_MAX_SYMBOLS} symbols per subscription")
+        if key not in self.groups:
+            self.store.rows(key)
+        return key
+
+    def subscribe(self, symbols: Optional[List[str]] = None) -> Subscription:
+        """Subscribe to a symbol list (None for everything); raises like subscription_key"""
+        key = self.subscription_key(symbols)
+        group = self.groups.get(key)
+        if group is None:
+            rows = None if key == ("*",) else self.store.rows(key)
+            group = SubscriptionGroup(key, rows, self.store)
+            self.groups[key] = group
+            for row in (rows.tolist() if rows is not None else ["*"]):
+                self.watchers.setdefault(row, set()).add(group)
+
+        subscription = Subscription(group)
+        group.subscriptions.add(subscription)
+        subscription.offer(group.snapshot_message())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        group = subscription.group
+        group.subscriptions.discard(subscription)
+        self.closed_dropped += subscription.dropped
+        if not group.subscriptions and self.groups.pop(group.key, None) is not None:
+            for row in (group.rows.tolist() if group.rows is not None else ["*"]):
+                watching = self.watchers.get(row)
+                watching.discard(group)
+                if not watching:
+                    del self.watchers[row]
+
+    def publish(self, changed_rows: np.ndarray):
+        """Fan out the rows that just changed to every group that watches them"""
+        started_at = time.perf_counter()
+        rows = np.unique(changed_rows).tolist()
+        version = self.store.version
+
+        # Encode each changed symbol once; group messages are joined from these fragments
+        records = self.store.snapshot(np.asarray(rows, dtype=np.intp))
+        fragments = {
+            row: json.dumps(symbol) + ":" + json.dumps(record, separators=(",", ":"))
+            for row, (symbol, record) in zip(rows, records.items())
+        }
+
+        affected: Dict[SubscriptionGroup, List[int]] = {}
+        for row in rows:
+            for group in self.watchers.get(row, ()):
+                affected.setdefault(group, []).append(row)
+        for group in self.watchers.get("*", ()):
+            affected[group] = rows
+
+        prefix = f'{{"type":"ticks","version":{version},"data":{{'
+        for group, group_rows in affected.items():
+            message = EncodedMessage(prefix + ",".join(fragments[row] for row in group_rows) + "}}")
+            self.messages_encoded += 1
+            for subscription in group.subscriptions:
+                subscription.offer(message)
+            self.messages_offered += len(group.subscriptions)
+
+        self.ticks += 1
+        self.last_publish_ms = (time.perf_counter() - started_at) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "groups": len(self.groups),
+            "ticks": self.ticks,
+            "messagesEncoded": self.messages_encoded,
+            "messagesOffered": self.messages_offered,
+            "dropped": self.closed_dropped + sum(
+                subscription.dropped for group in self.groups.values() for subscription in group.subscriptions
+            ),
+            "lastPublishMs": round(self.last_publish_ms, 3)
+        }
+
+class SimulatedTickSource:
+    """Random-walks a fraction of the universe every interval and publishes the changes"""
+
+    def __init__(
+        self,
+        hub: PriceHub,
+        interval_ms: int = PRICE_TICK_INTERVAL_MS,
+        fraction: float = PRICE_TICK_FRACTION,
+        volatility: float = PRICE_TICK_VOLATILITY,
+        seed: Optional[int] = None
+    ):
+        self.hub = hub
+        self.store = hub.store
+        self.interval = interval_ms / 1000
+        self.fraction = fraction
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.task = None
+
+    def tick(self) -> np.ndarray:
+        count = max(1, int(len(self.store) * self.fraction))
+        rows = self.rng.choice(len(self.store), size=count, replace=False)
+        moves = np.exp(self.rng.normal(0, self.volatility, size=count))
+        volumes = self.rng.integers(100, 10000, size=count)
+        self.store.apply_ticks(rows, self.store.prices[rows] * moves, volumes)
+        self.hub.publish(rows)
+        return rows
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.tick()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+            print(f"📈 Simulated price ticks every {self.interval * 1000:.0f}ms")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+# Global instances
+price_hub = PriceHub()
+tick_source = SimulatedTickSource(price_hub)
@@ -0,0 +1,92 @@
+"""
+Return and risk assumptions for the symbol universe (single-factor covariance model)
+"""
+
+import os
+from typing import Dict, List, Tuple
+import numpy as np
+from market_data import market_data, MarketDataStore
+
+# Annualized market factor volatility
+MARKET_VOLATILITY = float(os.getenv("MARKET_VOLATILITY", "0.16"))
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.03"))
+
+# Annualized (expected return, volatility, market beta) per symbol.
+# Symbols without an entry get DEFAULT_ASSUMPTION.
+SYMBOL_ASSUMPTIONS = {
+    "AAPL": (0.125, 0.28, 1.15),
+    "TSLA": (0.187, 0.60, 1.90),
+    "NVDA": (0.152, 0.50, 1.70),
+    "GOOGL": (0.115, 0.30, 1.05),
+    "AMZN": (0.120, 0.33, 1.20),
+    "MSFT": (0.110, 0.26, 0.95),
+    "META": (0.130, 0.38, 1.25),
+    "SPY": (0.090, 0.16, 1.00),
+}
+DEFAULT_ASSUMPTION = (0.08, 0.30, 1.0)
+
+# Broad asset classes accepted alongside symbols in allocations
+ASSET_CLASS_ASSUMPTIONS = {
+    "stocks": (0.090, 0.16, 1.00),
+    "bonds": (0.040, 0.06, 0.10),
+    "cash": (RISK_FREE_RATE, 0.005, 0.0),
+}
+
+class UnknownAsset(Exception):
+    """Raised for allocation keys that are neither a symbol nor an asset class"""
+
+class RiskModel:
+    """Expected returns, volatilities and betas for every symbol plus the asset classes"""
+
+    def __init__(self, store: MarketDataStore = None):
+        store = store or market_data
+        self.assets: List[str] = list(store.symbols) + list(ASSET_CLASS_ASSUMPTIONS)
+        self.index: Dict[str, int] = {asset: row for row, asset in enumerate(self.assets)}
+        assumptions = [SYMBOL_ASSUMPTIONS.get(symbol, DEFAULT_ASSUMPTION) for symbol in store.symbols]
+        assumptions.extend(ASSET_CLASS_ASSUMPTIONS.values())
+        self.expected_returns, self.volatilities, self.betas = (np.array(column) for column in zip(*assumptions))
+        # Whatever the factor doesn't explain is idiosyncratic, never below 1% vol
+        self.residual_variances = np.maximum(
+            self.volatilities ** 2 - (self.betas * MARKET_VOLATILITY) ** 2, 0.01 ** 2
+        )
+        # Covariance is l l' + diag(residual) with l the market loadings (single factor)
+        self.loadings = self.betas * MARKET_VOLATILITY
+        # Symbols are only ever appended, so the count identifies the symbol set;
+        # the assumptions are fixed at import. Prices play no part in the model.
+        self.universe_size = len(store)
+
+    def rows(self, assets) -> np.ndarray:
+        rows = []
+        for asset in assets:
+            row = self.index.get(asset) if asset in ASSET_CLASS_ASSUMPTIONS else self.index.get(asset.upper())
+            if row is None:
+                raise UnknownAsset(f"Unknown asset: {asset}")
+            rows.append(row)
+        return np.array(rows, dtype=np.intp)
+
+    def factors(self, rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(market loadings, residual variances) for some rows, all rows by default"""
+        if rows is None:
+            return self.loadings, self.residual_variances
+        return self.loadings[rows], self.residual_variances[rows]
+
+    def covariance(self, rows: np.ndarray = None) -> np.ndarray:
+        """Annualized covariance: beta_i * beta_j * market variance, plus residual variance on the diagonal"""
+        loadings, residuals = self.factors(rows)
+        covariance = np.outer(loadings, loadings)
+        covariance[np.diag_indices_from(covariance)] += residuals
+        return covariance
+
+    def parameters(self, assets) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(rows, expected returns, covariance) for a list of assets"""
+        rows = self.rows(assets)
+        return rows, self.expected_returns[rows], self.covariance(rows)
+
+_risk_model = None
+
+def get_risk_model() -> RiskModel:
+    """Shared risk model, rebuilt only when symbols are added to the universe"""
+    global _risk_model
+    if _risk_model is None or _risk_model.universe_size != len(market_data):
+        _risk_model = RiskModel(market_data)
+    return _risk_model
@@ -0,0 +1,253 @@
+"""
+Non-blocking Google Sheets v4 REST client for swipr.ai
+"""
+
+import os
+import time
+import random
+import asyncio
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from urllib.parse import quote
+import httpx
+from google.auth.transport.requests import Request
+
+# Point this at a local stand-in to run without Google
+SHEETS_API_BASE_URL = os.getenv("SHEETS_API_BASE_URL", "https://sheets.googleapis.com")
+SHEETS_MAX_CONNECTIONS = int(os.getenv("SHEETS_MAX_CONNECTIONS", "10"))
+SHEETS_TIMEOUT_SECONDS = float(os.getenv("SHEETS_TIMEOUT_SECONDS", "30"))
+# Google's default quota is 60 requests per minute per user
+SHEETS_REQUESTS_PER_MINUTE = int(os.getenv("SHEETS_REQUESTS_PER_MINUTE", "60"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+SHEETS_BACKOFF_BASE_SECONDS = float(os.getenv("SHEETS_BACKOFF_BASE_SECONDS", "1"))
+SHEETS_BACKOFF_MAX_SECONDS = float(os.getenv("SHEETS_BACKOFF_MAX_SECONDS", "64"))
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class SheetsApiError(Exception):
+    """Raised for non-2xx responses from the Sheets API"""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Sheets API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+class SheetsRequestScheduler:
+    """Token-bucket rate limiting plus jittered exponential backoff for Sheets calls
+
+    Shared by every client in the process so the quota is tracked in one place.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = SHEETS_REQUESTS_PER_MINUTE,
+        max_retries: int = SHEETS_MAX_RETRIES,
+        backoff_base: float = SHEETS_BACKOFF_BASE_SECONDS,
+        backoff_max: float = SHEETS_BACKOFF_MAX_SECONDS
+    ):
+        self.capacity = requests_per_minute
+        self.refill_per_second = requests_per_minute / 60
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.tokens = float(requests_per_minute)
+        self.updated_at = time.monotonic()
+        # Waiters take tokens strictly in arrival order
+        self.queue_lock = asyncio.Lock()
+        self.waiting = 0
+        self.counters = {
+            "requests": 0,
+            "throttled": 0,
+            "retries": 0,
+            "rateLimited": 0,
+            "serverErrors": 0,
+            "networkErrors": 0,
+            "failures": 0
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait for a quota token"""
+        self.waiting += 1
+        try:
+            async with self.queue_lock:
+                self._refill()
+                if self.tokens < 1:
+                    self.counters["throttled"] += 1
+                    while self.tokens < 1:
+                        await asyncio.sleep((1 - self.tokens) / self.refill_per_second)
+                        self._refill()
+                self.tokens -= 1
+        finally:
+            self.waiting -= 1
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+    async def run(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one Sheets call under the quota, retrying 429/5xx and network errors"""
+        attempt = 0
+        while True:
+            await self.acquire()
+            self.counters["requests"] += 1
+            try:
+                return await send()
+            except SheetsApiError as e:
+                if e.status_code not in RETRYABLE_STATUS_CODES:
+                    self.counters["failures"] += 1
+                    raise
+                self.counters["rateLimited" if e.status_code == 429 else "serverErrors"] += 1
+                error, retry_after = e, e.retry_after
+            except httpx.TransportError as e:
+                self.counters["networkErrors"] += 1
+                error, retry_after = e, None
+
+            if attempt >= self.max_retries:
+                self.counters["failures"] += 1
+                raise error
+            delay = self.backoff_delay(attempt, retry_after)
+            attempt += 1
+            self.counters["retries"] += 1
+            print(f"⏳ Sheets request failed ({error}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            **self.counters,
+            "queueDepth": self.waiting,
+            "tokensAvailable": round(self.tokens, 2),
+            "requestsPerMinute": self.capacity
+        }
+
+class AsyncSheetsClient:
+    def __init__(
+        self,
+        credentials=None,
+        base_url: str = SHEETS_API_BASE_URL,
+        max_connections: int = SHEETS_MAX_CONNECTIONS,
+        timeout: float = SHEETS_TIMEOUT_SECONDS,
+        scheduler: SheetsRequestScheduler = None
+    ):
+        self.scheduler = scheduler or sheets_request_scheduler
+        self.credentials = credentials
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.http = None
+        self.token_lock = asyncio.Lock()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        # One pooled keep-alive client for every Sheets call in the process
+        if self.http is None or self.http.is_closed:
+            self.http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self.http
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        """Bearer token for the service account, refreshed once for all waiters"""
+        if self.credentials is None:
+            return {}
+        if not self.credentials.valid:
+            async with self.token_lock:
+                if not self.credentials.valid:
+                    # Token refresh is a rare blocking call, keep it off the event loop
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    async def request(self, method: str, path: str, params: Dict[str, Any] = None, json: Dict[str, Any] = None) -> Dict[str, Any]:
+        return await self.scheduler.run(lambda: self._send(method, path, params, json))
+
+    async def _send(self, method: str, path: str, params: Dict[str, Any] = None, json: Dict[str, Any] = None) -> Dict[str, Any]:
+        headers = await self._auth_headers()
+        response = await self._get_http().request(method, path, params=params, json=json, headers=headers)
+        if response.status_code >= 400:
+            try:
+                message = response.json().get('error', {}).get('message', response.text)
+            except ValueError:
+                message = response.text
+            try:
+                retry_after = float(response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                retry_after = None
+            raise SheetsApiError(response.status_code, message, retry_after)
+        return response.json() if response.content else {}
+
+    @staticmethod
+    def _values_path(spreadsheet_id: str, range_name: str = None, action: str = "") -> str:
+        path = f"/v4/spreadsheets/{quote(spreadsheet_id, safe='')}/values"
+        if range_name is not None:
+            path += f"/{quote(range_name, safe='')}"
+        return path + action
+
+    async def create_spreadsheet(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.request("POST", "/v4/spreadsheets", json=body)
+
+    async def get_spreadsheet(self, spreadsheet_id: str, fields: str = None) -> Dict[str, Any]:
+        params = {"fields": fields} if fields else None
+        return await self.request("GET", f"/v4/spreadsheets/{quote(spreadsheet_id, safe='')}", params=params)
+
+    async def batch_update(self, spreadsheet_id: str, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.request(
+            "POST",
+            f"/v4/spreadsheets/{quote(spreadsheet_id, safe='')}:batchUpdate",
+            json={"requests": requests}
+        )
+
+    async def values_update(self, spreadsheet_id: str, range_name: str, values: List[List[Any]], value_input_option: str = 'RAW') -> Dict[str, Any]:
+        return await self.request(
+            "PUT",
+            self._values_path(spreadsheet_id, range_name),
+            params={"valueInputOption": value_input_option},
+            json={"range": range_name, "majorDimension": "ROWS", "values": values}
+        )
+
+    async def values_append(self, spreadsheet_id: str, range_name: str, values: List[List[Any]], value_input_option: str = 'RAW') -> Dict[str, Any]:
+        return await self.request(
+            "POST",
+            self._values_path(spreadsheet_id, range_name, ":append"),
+            params={"valueInputOption": value_input_option, "insertDataOption": "INSERT_ROWS"},
+            json={"range": range_name, "majorDimension": "ROWS", "values": values}
+        )
+
+    async def values_clear(self, spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
+        return await self.request("POST", self._values_path(spreadsheet_id, range_name, ":clear"), json={})
+
+    async def values_batch_clear(self, spreadsheet_id: str, ranges: List[str]) -> Dict[str, Any]:
+        return await self.request("POST", self._values_path(spreadsheet_id, action=":batchClear"), json={"ranges": ranges})
+
+    async def values_get(self, spreadsheet_id: str, range_name: str) -> Dict[str, Any]:
+        return await self.request("GET", self._values_path(spreadsheet_id, range_name))
+
+    async def values_batch_get(self, spreadsheet_id: str, ranges: List[str]) -> Dict[str, Any]:
+        return await self.request(
+            "GET",
+            self._values_path(spreadsheet_id, action=":batchGet"),
+            params={"ranges": ranges}
+        )
+
+    async def values_batch_update(self, spreadsheet_id: str, data: List[Dict[str, Any]], value_input_option: str = 'RAW') -> Dict[str, Any]:
+        return await self.request(
+            "POST",
+            self._values_path(spreadsheet_id, action=":batchUpdate"),
+            json={"valueInputOption": value_input_option, "data": data}
+        )
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+
+# Global instance
+sheets_request_scheduler = SheetsRequestScheduler()
@@ -4,25 +4,164 @@ Google Sheets integration for swipr.ai
 
 import os
 import json
-from typing import List, Dict, Any
+import time
+import asyncio
+import contextlib
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple
+from bson import ObjectId
 from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from sheets_client import AsyncSheetsClient, SheetsApiError
+from cell_format import format_cell
 from database import (
     get_waitlist_collection,
     get_contact_messages_collection,
-    get_job_applications_collection
+    get_job_applications_collection,
+    get_sheets_sync_state_collection
 )
 
 # Google Sheets configuration
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
+# Mongo documents fetched per cursor round-trip, and rows sent per Sheets write
+CURSOR_BATCH_SIZE = int(os.getenv("SHEETS_CURSOR_BATCH_SIZE", "1000"))
+WRITE_CHUNK_ROWS = int(os.getenv("SHEETS_WRITE_CHUNK_ROWS", "5000"))
+# Google caps a spreadsheet at 10M cells; big collections roll over into "Title (2)", "Title (3)"...
+SPREADSHEET_CELL_LIMIT = 10_000_000
+MAX_ROWS_PER_TAB = int(os.getenv("SHEETS_MAX_ROWS_PER_TAB", "500000"))
+SYNC_WINDOW_SECONDS = float(os.getenv("SHEETS_SYNC_WINDOW_SECONDS", "10"))
+SYNC_MAX_FAILURE_RETRIES = int(os.getenv("SHEETS_SYNC_MAX_FAILURE_RETRIES", "3"))
+# _ids are generated client-side, so a document can commit after newer ones; re-scan this far behind the watermark
+SYNC_LAG_SECONDS = float(os.getenv("SHEETS_SYNC_LAG_SECONDS", "120"))
+
+# How each collection maps onto its sheet: (header, document field) per column
+SHEET_SPECS = {
+    'waitlist': {
+        'title': 'Waitlist',
+        'label': 'waitlist entries',
+        'collection': get_waitlist_collection,
+        'columns': [
+            ('Email', 'email'),
+            ('Name', 'name'),
+            ('Interests', 'interests'),
+            ('Position', 'position'),
+            ('Joined At', 'joinedAt'),
+            ('Status', 'status')
+        ]
+    },
+    'contact_messages': {
+        'title': 'Contact Messages',
+        'label': 'contact messages',
+        'collection': get_contact_messages_collection,
+        'columns': [
+            ('Name', 'name'),
+            ('Email', 'email'),
+            ('Message', 'message'),
+            ('Status', 'status'),
+            ('Created At', 'createdAt')
+        ]
+    },
+    'job_applications': {
+        'title': 'Job Applications',
+        'label': 'job applications',
+        'collection': get_job_applications_collection,
+        'columns': [
+            ('Name', 'name'),
+            ('Email', 'email'),
+            ('Phone', 'phone'),
+            ('Position', 'position'),
+            ('Cover Letter', 'coverLetter'),
+            ('Resume URL', 'resumeUrl'),
+            ('Status', 'status'),
+            ('Created At', 'createdAt')
+        ]
+    }
+}
+
+def column_letter(column_number: int) -> str:
+    """1 -> A, 26 -> Z, 27 -> AA"""
+    letters = ""
+    while column_number:
+        column_number, remainder = divmod(column_number - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def sheet_headers(sheet_key: str) -> List[str]:
+    return [header for header, _ in SHEET_SPECS[sheet_key]['columns']]
+
+def sheet_projection(sheet_key: str) -> Dict[str, int]:
+    """Only fetch the fields that end up in the sheet"""
+    return {field: 1 for _, field in SHEET_SPECS[sheet_key]['columns']}
+
+def sheet_last_column(sheet_key: str) -> str:
+    return column_letter(len(SHEET_SPECS[sheet_key]['columns']))
+
+def build_row(sheet_key: str, document: Dict[str, Any]) -> List[str]:
+    return [format_cell(document.get(field)) for _, field in SHEET_SPECS[sheet_key]['columns']]
+
+def tab_title(sheet_key: str, tab_index: int) -> str:
+    title = SHEET_SPECS[sheet_key]['title']
+    return title if tab_index == 0 else f"{title} ({tab_index + 1})"
+
+def rows_per_tab(sheet_key: str) -> int:
+    """Data rows a single tab holds before rolling over (row 1 is the header)"""
+    width = len(SHEET_SPECS[sheet_key]['columns'])
+    return max(1, min(MAX_ROWS_PER_TAB, SPREADSHEET_CELL_LIMIT // width - 1))
+
+def plan_row_ranges(sheet_key: str, first_row_index: int, row_count: int) -> List[Tuple[int, int, int, int]]:
+    """Split data rows [first, first + count) into (tab, first sheet row, offset, length) pieces"""
+    per_tab = rows_per_tab(sheet_key)
+    pieces = []
+    offset = 0
+    while offset < row_count:
+        tab_index, row_in_tab = divmod(first_row_index + offset, per_tab)
+        length = min(per_tab - row_in_tab, row_count - offset)
+        pieces.append((tab_index, row_in_tab + 2, offset, length))
+        offset += length
+    return pieces
+
+def state_watermark(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Watermark fields of a sync state; states written before the lag window start it at lastId"""
+    if state is None:
+        return {"lastId": None, "windowStart": None, "recentIds": []}
+    return {
+        "lastId": state.get('lastId'),
+        "windowStart": state.get('windowStart', state.get('lastId')),
+        "recentIds": state.get('recentIds', [])
+    }
+
+def watermark_query(watermark: Dict[str, Any]) -> Dict[str, Any]:
+    """Documents not synced yet: past the window start, minus the ids already synced inside the window"""
+    if watermark['windowStart'] is None:
+        return {}
+    return {"_id": {"$gt": watermark['windowStart'], "$nin": watermark['recentIds']}}
+
+def advance_watermark(watermark: Dict[str, Any], documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Watermark after syncing documents, remembering the synced ids still inside the lag window"""
+    last_id = max(document['_id'] for document in documents)
+    if watermark['lastId'] is not None:
+        last_id = max(last_id, watermark['lastId'])
+    window_start = ObjectId.from_datetime(last_id.generation_time - timedelta(seconds=SYNC_LAG_SECONDS))
+    if watermark['windowStart'] is not None:
+        window_start = max(window_start, watermark['windowStart'])
+    synced = set(watermark['recentIds']).union(document['_id'] for document in documents)
+    return {
+        "lastId": last_id,
+        "windowStart": window_start,
+        "recentIds": sorted(_id for _id in synced if _id > window_start)
+    }
+
+class SheetsCapacityError(Exception):
+    """Raised when a write would push the spreadsheet past Google's cell limit"""
 
 class GoogleSheetsManager:
     def __init__(self):
         self.creds = None
-        self.service = None
+        self.client = None
         self.spreadsheet_id = SPREADSHEET_ID
+        self.sync_locks = defaultdict(asyncio.Lock)
+        self.sheet_properties = None
         
     async def authenticate(self):
         """Authenticate with Google Sheets API"""
@@ -52,8 +191,10 @@ class GoogleSheetsManager:
             )
             print("✅ Credentials created successfully")
             
-            print("🔐 Building Google Sheets service...")
-            self.service = build('sheets', 'v4', credentials=self.creds)
+            print("🔐 Building Google Sheets client...")
+            if self.client is not None:
+                await self.client.close()
+            self.client = AsyncSheetsClient(credentials=self.creds)
             print("✅ Google Sheets authentication successful")
             return True
         except Exception as e:
@@ -63,7 +204,7 @@ class GoogleSheetsManager:
     async def create_spreadsheet(self, title: str = "Swipr.ai Data"):
         """Create a new Google Spreadsheet"""
         try:
-            if not self.service:
+            if not self.client:
                 if not await self.authenticate():
                     return None
                 
@@ -102,7 +243,7 @@ class GoogleSheetsManager:
                 ]
             }
             
-            spreadsheet = self.service.spreadsheets().create(body=spreadsheet).execute()
+            spreadsheet = await self.client.create_spreadsheet(spreadsheet)
             self.spreadsheet_id = spreadsheet['spreadsheetId']
             print(f"✅ Created new spreadsheet: {self.spreadsheet_id}")
             
@@ -119,209 +260,322 @@ class GoogleSheetsManager:
         if not self.spreadsheet_id:
             return
             
-        headers = {
-            'Waitlist': ['Email', 'Name', 'Interests', 'Position', 'Joined At', 'Status'],
-            'Contact Messages': ['Name', 'Email', 'Message', 'Status', 'Created At'],
-            'Job Applications': ['Name', 'Email', 'Phone', 'Position', 'Cover Letter', 'Resume URL', 'Status', 'Created At']
-        }
-        
-        for sheet_name, header_row in headers.items():
-            range_name = f"{sheet_name}!A1:{chr(65 + len(header_row) - 1)}1"
-            body = {
-                'values': [header_row]
-            }
+        for sheet_key, spec in SHEET_SPECS.items():
+            range_name = f"{spec['title']}!A1:{sheet_last_column(sheet_key)}1"
             try:
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
+                await self.client.values_update(self.spreadsheet_id, range_name, [sheet_headers(sheet_key)])
             except Exception as e:
-                print(f"❌ Failed to set headers for {sheet_name}: {e}")
+                print(f"❌ Failed to set headers for {spec['title']}: {e}")
 
-    async def sync_waitlist(self):
-        """Sync waitlist data to Google Sheets"""
-        if not self.spreadsheet_id or not self.service:
-            print("❌ No spreadsheet ID or service available, attempting authentication...")
+    async def ensure_ready(self) -> bool:
+        """Make sure we are authenticated and have a spreadsheet to write to"""
+        if not self.spreadsheet_id or not self.client:
+            print("❌ No spreadsheet ID or client available, attempting authentication...")
             if not await self.authenticate():
                 print("❌ Authentication failed")
                 return False
             if not self.spreadsheet_id:
                 print("❌ No spreadsheet ID available")
                 return False
-            
+        return True
+
+    async def sync_waitlist(self, incremental: bool = True):
+        """Sync waitlist data to Google Sheets"""
+        return await self.sync_sheet("waitlist", incremental)
+
+    async def sync_contact_messages(self, incremental: bool = True):
+        """Sync contact messages to Google Sheets"""
+        return await self.sync_sheet("contact_messages", incremental)
+
+    async def sync_job_applications(self, incremental: bool = True):
+        """Sync job applications to Google Sheets"""
+        return await self.sync_sheet("job_applications", incremental)
+
+    async def sync_sheet(self, sheet_key: str, incremental: bool = True):
+        """Sync one collection, writing only new rows unless a full rebuild is requested"""
+        if not await self.ensure_ready():
+            return False
+
+        spec = SHEET_SPECS[sheet_key]
         try:
-            # Get all waitlist entries from MongoDB
-            waitlist_collection = get_waitlist_collection()
-            if waitlist_collection is None:
-                print("❌ Waitlist collection not available")
+            state_collection = get_sheets_sync_state_collection()
+            if state_collection is None:
+                print("❌ Sheets sync state collection not available")
                 return False
-                
-            cursor = waitlist_collection.find({})
-            waitlist_data = await cursor.to_list(length=1000)  # Limit to 1000 entries to prevent timeout
-            
-            if not waitlist_data:
-                print("ℹ️ No waitlist data to sync")
-                return True
-                
-            # Prepare data for sheets
-            values = []
-            for entry in waitlist_data:
-                values.append([
-                    entry.get('email', ''),
-                    entry.get('name', ''),
-                    ', '.join(entry.get('interests', [])),
-                    str(entry.get('position', '')),
-                    entry.get('joinedAt', ''),
-                    entry.get('status', '')
-                ])
-            
-            # Clear existing data and add new data
-            range_name = 'Waitlist!A2:F1000'
-            body = {'values': values}
-            
-            try:
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
-            except HttpError as e:
-                print(f"❌ Google Sheets API error: {e}")
-                return False
-            
-            print(f"✅ Synced {len(values)} waitlist entries to Google Sheets")
-            return True
+
+            async with self.sync_locks[sheet_key]:
+                state = await state_collection.find_one({"_id": sheet_key})
+                return await self._write_sheets([sheet_key], {sheet_key: state} if state else {}, incremental)
         except Exception as e:
-            print(f"❌ Failed to sync waitlist: {e}")
+            print(f"❌ Failed to sync {spec['title']}: {e}")
             return False
 
-    async def sync_contact_messages(self):
-        """Sync contact messages to Google Sheets"""
-        if not self.spreadsheet_id or not self.service:
-            print("❌ No spreadsheet ID or service available, attempting authentication...")
-            if not await self.authenticate():
-                print("❌ Authentication failed")
-                return False
-            if not self.spreadsheet_id:
-                print("❌ No spreadsheet ID available")
-                return False
-            
+    async def _load_sheet_properties(self) -> Dict[str, Dict[str, Any]]:
+        """Tab titles and grid sizes, cached until a write fails"""
+        if self.sheet_properties is None:
+            spreadsheet = await self.client.get_spreadsheet(
+                self.spreadsheet_id,
+                fields="sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))"
+            )
+            self.sheet_properties = {
+                sheet['properties']['title']: sheet['properties']
+                for sheet in spreadsheet.get('sheets', [])
+            }
+        return self.sheet_properties
+
+    async def _ensure_grid_capacity(self, required: Dict[str, Tuple[int, int, int]]):
+        """Add missing tabs and grow grids so every write lands inside them
+
+        required maps tab title -> (rows needed, columns, max rows for the tab)
+        """
+        properties = await self._load_sheet_properties()
+        grids = {
+            title: (props['gridProperties'].get('rowCount', 0), props['gridProperties'].get('columnCount', 0))
+            for title, props in properties.items()
+        }
+        requests = []
+        for title, (rows_needed, columns, max_rows) in required.items():
+            if title not in grids:
+                grids[title] = (rows_needed, columns)
+                requests.append({'addSheet': {'properties': {
+                    'title': title,
+                    'gridProperties': {'rowCount': rows_needed, 'columnCount': columns}
+                }}})
+                continue
+            row_count, column_count = grids[title]
+            if rows_needed <= row_count and columns <= column_count:
+                continue
+            # Grow geometrically so a long export only resizes a handful of times
+            grids[title] = (max(rows_needed, min(row_count * 2, max_rows)), max(columns, column_count))
+            requests.append({'updateSheetProperties': {
+                'properties': {
+                    'sheetId': properties[title]['sheetId'],
+                    'gridProperties': {'rowCount': grids[title][0], 'columnCount': grids[title][1]}
+                },
+                'fields': 'gridProperties(rowCount,columnCount)'
+            }})
+
+        if not requests:
+            return
+        total_cells = sum(rows * columns for rows, columns in grids.values())
+        if total_cells > SPREADSHEET_CELL_LIMIT:
+            raise SheetsCapacityError(
+                f"Spreadsheet would need {total_cells} cells (limit {SPREADSHEET_CELL_LIMIT})"
+            )
+
+        response = await self.client.batch_update(self.spreadsheet_id, requests)
+        for request, reply in zip(requests, response.get('replies', [])):
+            if 'addSheet' in request:
+                added = reply.get('addSheet', {}).get('properties', request['addSheet']['properties'])
+                properties[added['title']] = added
+        for title, (rows, columns) in grids.items():
+            if title in properties:
+                properties[title].setdefault('gridProperties', {}).update({'rowCount': rows, 'columnCount': columns})
+
+    async def _write_sheets(self, sheet_keys: List[str], states: Dict[str, Any], incremental: bool):
+        """Stream new rows (all rows for a rebuild) into the sheets, one chunk per Sheets round-trip
+
+        Every round reads the next chunk of each collection concurrently and writes all of
+        them, headers included, with a single values.batchUpdate.
+        """
+        state_collection = get_sheets_sync_state_collection()
+        if state_collection is None:
+            print("❌ Sheets sync state collection not available")
+            return False
+
+        # Sheets without a watermark, or whose last rebuild never finished, can't be appended to safely
+        rebuild = {
+            key: not incremental or states.get(key) is None or states[key].get('rebuilding', False)
+            for key in sheet_keys
+        }
+        watermarks = {key: state_watermark(None if rebuild[key] else states[key]) for key in sheet_keys}
+        next_row = {key: 0 if rebuild[key] else states[key].get('rows', 0) for key in sheet_keys}
+        cursors = {}
         try:
-            # Get all contact messages from MongoDB
-            contact_messages_collection = get_contact_messages_collection()
-            if contact_messages_collection is None:
-                print("❌ Contact messages collection not available")
-                return False
-                
-            cursor = contact_messages_collection.find({})
-            messages_data = await cursor.to_list(length=1000)  # Limit to 1000 entries to prevent timeout
-            
-            if not messages_data:
-                print("ℹ️ No contact messages to sync")
-                return True
-                
-            # Prepare data for sheets
-            values = []
-            for message in messages_data:
-                values.append([
-                    message.get('name', ''),
-                    message.get('email', ''),
-                    message.get('message', ''),
-                    message.get('status', ''),
-                    message.get('createdAt', '')
-                ])
-            
-            # Clear existing data and add new data
-            range_name = 'Contact Messages!A2:E1000'
-            body = {'values': values}
-            
+            for key in sheet_keys:
+                collection = SHEET_SPECS[key]['collection']()
+                if collection is None:
+                    print(f"❌ {SHEET_SPECS[key]['title']} collection not available")
+                    return False
+                cursors[key] = collection.find(
+                    watermark_query(watermarks[key]), projection=sheet_projection(key)
+                ).sort("_id", 1).batch_size(CURSOR_BATCH_SIZE)
+            return await self._stream_rows(sheet_keys, states, rebuild, watermarks, next_row, cursors)
+        finally:
+            # Early returns and errors must not leave cursors open on the server
+            for cursor in cursors.values():
+                await cursor.close()
+
+    async def _stream_rows(
+        self,
+        sheet_keys: List[str],
+        states: Dict[str, Any],
+        rebuild: Dict[str, bool],
+        watermarks: Dict[str, Dict[str, Any]],
+        next_row: Dict[str, int],
+        cursors: Dict[str, Any]
+    ) -> bool:
+        state_collection = get_sheets_sync_state_collection()
+        written = defaultdict(int)
+        active = list(sheet_keys)
+        first_round = True
+        while active:
+            chunks = dict(zip(active, await asyncio.gather(*(
+                cursors[key].to_list(length=WRITE_CHUNK_ROWS) for key in active
+            ))))
+
+            # Claim incremental chunks up front (compare-and-set on the row count, which every claim
+            # moves) so concurrent workers never write them twice or at the same rows
+            claimed = set()
+            advanced = {key: advance_watermark(watermarks[key], chunks[key]) for key in active if chunks[key]}
             try:
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
-            except HttpError as e:
+                for key in active:
+                    documents = chunks[key]
+                    if not documents:
+                        continue
+                    if rebuild[key]:
+                        # Mark the sheet before overwriting it: if the rebuild dies partway, the next
+                        # sync rebuilds again instead of appending at the old offset. rows only grows
+                        # here, so the rows this attempt wrote are still cleared when it finishes.
+                        await state_collection.update_one(
+                            {"_id": key},
+                            {"$set": {"rebuilding": True, "lastId": None, "updatedAt": datetime.now().isoformat()},
+                             "$max": {"rows": next_row[key] + len(documents)}},
+                            upsert=True
+                        )
+                        continue
+                    result = await state_collection.update_one(
+                        {"_id": key, "rows": next_row[key], "rebuilding": {"$exists": False}},
+                        {"$set": {**advanced[key], "updatedAt": datetime.now().isoformat()},
+                         "$inc": {"rows": len(documents)}}
+                    )
+                    if result.matched_count:
+                        claimed.add(key)
+                    else:
+                        print(f"ℹ️ {SHEET_SPECS[key]['title']} watermark moved by another sync, skipping")
+
+                data = []
+                required = {}
+                for key in active:
+                    width = len(SHEET_SPECS[key]['columns'])
+                    last_column = sheet_last_column(key)
+                    max_rows = rows_per_tab(key) + 1
+                    if first_round:
+                        data.append({'range': f"{tab_title(key, 0)}!A1:{last_column}1", 'values': [sheet_headers(key)]})
+                        required[tab_title(key, 0)] = (1, width, max_rows)
+                    if not rebuild[key] and key not in claimed:
+                        continue
+
+                    values = [build_row(key, document) for document in chunks[key]]
+                    for tab_index, start_row, offset, length in plan_row_ranges(key, next_row[key], len(values)):
+                        title = tab_title(key, tab_index)
+                        end_row = start_row + length - 1
+                        required[title] = (max(required.get(title, (0,))[0], end_row), width, max_rows)
+                        if tab_index and start_row == 2:
+                            # First rows of a rollover tab get their own header
+                            data.append({'range': f"{title}!A1:{last_column}1", 'values': [sheet_headers(key)]})
+                        data.append({
+                            'range': f"{title}!A{start_row}:{last_column}{end_row}",
+                            'values': values[offset:offset + length]
+                        })
+
+                await self._ensure_grid_capacity(required)
+                await self.client.values_batch_update(self.spreadsheet_id, data)
+            except (SheetsApiError, SheetsCapacityError) as e:
+                # Release this round's claims so the next sync retries these rows
+                await self._release_claims(claimed, chunks, watermarks, next_row)
+                self.sheet_properties = None
                 print(f"❌ Google Sheets API error: {e}")
                 return False
-            
-            print(f"✅ Synced {len(values)} contact messages to Google Sheets")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to sync contact messages: {e}")
-            return False
+            except BaseException:
+                # Transport, credential and cancellation errors still propagate, but never strand a claim
+                await self._release_claims(claimed, chunks, watermarks, next_row)
+                self.sheet_properties = None
+                raise
 
-    async def sync_job_applications(self):
-        """Sync job applications to Google Sheets"""
-        if not self.spreadsheet_id or not self.service:
-            print("❌ No spreadsheet ID or service available, attempting authentication...")
-            if not await self.authenticate():
-                print("❌ Authentication failed")
-                return False
-            if not self.spreadsheet_id:
-                print("❌ No spreadsheet ID available")
-                return False
-            
-        try:
-            # Get all job applications from MongoDB
-            job_applications_collection = get_job_applications_collection()
-            if job_applications_collection is None:
-                print("❌ Job applications collection not available")
-                return False
-                
-            cursor = job_applications_collection.find({})
-            applications_data = await cursor.to_list(length=1000)  # Limit to 1000 entries to prevent timeout
-            
-            if not applications_data:
-                print("ℹ️ No job applications to sync")
-                return True
-                
-            # Prepare data for sheets
-            values = []
-            for app in applications_data:
-                values.append([
-                    app.get('name', ''),
-                    app.get('email', ''),
-                    app.get('phone', ''),
-                    app.get('position', ''),
-                    app.get('coverLetter', ''),
-                    app.get('resumeUrl', ''),
-                    app.get('status', ''),
-                    app.get('createdAt', '')
-                ])
-            
-            # Clear existing data and add new data
-            range_name = 'Job Applications!A2:H1000'
-            body = {'values': values}
-            
+            for key in active:
+                if rebuild[key] or key in claimed:
+                    count = len(chunks[key])
+                    next_row[key] += count
+                    written[key] += count
+                    if count:
+                        watermarks[key] = advanced[key]
+            active = [
+                key for key in active
+                if len(chunks[key]) == WRITE_CHUNK_ROWS and (rebuild[key] or key in claimed)
+            ]
+            first_round = False
+
+        for key in sheet_keys:
+            spec = SHEET_SPECS[key]
+            if rebuild[key]:
+                if not await self._finish_rebuild(key, states.get(key), written[key], watermarks[key]):
+                    return False
+                print(f"✅ Rebuilt {spec['title']} sheet with {written[key]} {spec['label']}")
+            elif written[key]:
+                print(f"✅ Wrote {written[key]} new {spec['label']} to Google Sheets")
+            else:
+                print(f"ℹ️ No new {spec['label']} to sync")
+        return True
+
+    async def _release_claims(
+        self,
+        claimed,
+        chunks: Dict[str, List],
+        watermarks: Dict[str, Dict[str, Any]],
+        next_row: Dict[str, int]
+    ):
+        """Move claimed watermarks back so the unwritten rows are picked up again"""
+        state_collection = get_sheets_sync_state_collection()
+        for key in claimed:
+            await state_collection.update_one(
+                {"_id": key, "rows": next_row[key] + len(chunks[key])},
+                {"$set": {**watermarks[key], "rows": next_row[key]}}
+            )
+
+    async def _finish_rebuild(
+        self,
+        sheet_key: str,
+        previous_state: Dict[str, Any],
+        rows: int,
+        watermark: Dict[str, Any]
+    ) -> bool:
+        """Clear rows left over from a longer previous sync and reset the watermark"""
+        previous_rows = (previous_state or {}).get('rows', 0)
+        if previous_rows > rows:
+            last_column = sheet_last_column(sheet_key)
+            ranges = [
+                f"{tab_title(sheet_key, tab_index)}!A{start_row}:{last_column}{start_row + length - 1}"
+                for tab_index, start_row, _, length in plan_row_ranges(sheet_key, rows, previous_rows - rows)
+            ]
             try:
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=self.spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
-            except HttpError as e:
+                await self.client.values_batch_clear(self.spreadsheet_id, ranges)
+            except SheetsApiError as e:
                 print(f"❌ Google Sheets API error: {e}")
                 return False
-            
-            print(f"✅ Synced {len(values)} job applications to Google Sheets")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to sync job applications: {e}")
-            return False
 
-    async def sync_all_data(self):
+        # Anything past the rebuilt rows is picked up by the next incremental sync
+        state_collection = get_sheets_sync_state_collection()
+        await state_collection.update_one(
+            {"_id": sheet_key},
+            {"$set": {**watermark, "rows": rows, "updatedAt": datetime.now().isoformat()},
+             "$unset": {"rebuilding": ""}},
+            upsert=True
+        )
+        return True
+
+    async def close(self):
+        """Release pooled HTTP connections"""
+        if self.client is not None:
+            await self.client.close()
+
+    async def sync_all_data(self, incremental: bool = True):
         """Sync all data to Google Sheets"""
         print("🔄 Starting Google Sheets sync...")
         
         # Check if we have credentials
-        if not self.service:
-            print("🔐 No service available, attempting authentication...")
+        if not self.client:
+            print("🔐 No client available, attempting authentication...")
             if not await self.authenticate():
                 print("❌ Authentication failed")
                 return False
@@ -337,13 +591,25 @@ class GoogleSheetsManager:
             
         print(f"📊 Using spreadsheet ID: {self.spreadsheet_id}")
         
-        success = True
-        print("🔄 Syncing waitlist...")
-        success &= await self.sync_waitlist()
-        print("🔄 Syncing contact messages...")
-        success &= await self.sync_contact_messages()
-        print("🔄 Syncing job applications...")
-        success &= await self.sync_job_applications()
+        state_collection = get_sheets_sync_state_collection()
+        if state_collection is None:
+            print("❌ Sheets sync state collection not available")
+            return False
+
+        sheet_keys = list(SHEET_SPECS)
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                for key in sheet_keys:
+                    await stack.enter_async_context(self.sync_locks[key])
+                states = {
+                    state['_id']: state
+                    async for state in state_collection.find({"_id": {"$in": sheet_keys}})
+                }
+                # One concurrent read per collection, one Sheets round-trip for everything
+                success = await self._write_sheets(sheet_keys, states, incremental)
+        except Exception as e:
+            print(f"❌ Failed to sync Google Sheets: {e}")
+            success = False
         
         if success:
             print("✅ All data synced to Google Sheets successfully")
@@ -352,5 +618,80 @@ class GoogleSheetsManager:
             
         return success
 
-# Global instance
-sheets_manager = GoogleSheetsManager() 
\ No newline at end of file
+class SheetsSyncScheduler:
+    """Coalesces sync requests so each sheet syncs at most once per window"""
+
+    def __init__(self, manager: GoogleSheetsManager, window_seconds: float = SYNC_WINDOW_SECONDS):
+        self.manager = manager
+        self.window_seconds = window_seconds
+        self.dirty = {}
+        self.tasks = {}
+        self.last_started = {}
+        self.stats_by_sheet = defaultdict(lambda: {
+            "requests": 0,
+            "runs": 0,
+            "failures": 0,
+            "failureStreak": 0,
+            "lastSyncAt": None,
+            "lastSyncLatencyMs": None
+        })
+
+    def request_sync(self, sheet_key: str):
+        """Mark a sheet dirty; a sync runs once the window allows"""
+        self.stats_by_sheet[sheet_key]["requests"] += 1
+        self.dirty[sheet_key] = self.dirty.get(sheet_key, 0) + 1
+        task = self.tasks.get(sheet_key)
+        if task is None or task.done():
+            self.tasks[sheet_key] = asyncio.create_task(self._run(sheet_key))
+
+    async def _run(self, sheet_key: str):
+        # Requests that arrive while we wait or sync are merged into the next pass
+        while self.dirty.get(sheet_key):
+            elapsed = time.monotonic() - self.last_started.get(sheet_key, float('-inf'))
+            if elapsed < self.window_seconds:
+                await asyncio.sleep(self.window_seconds - elapsed)
+
+            self.dirty[sheet_key] = 0
+            self.last_started[sheet_key] = time.monotonic()
+            stats = self.stats_by_sheet[sheet_key]
+            try:
+                success = await self.manager.sync_sheet(sheet_key)
+            except Exception as e:
+                print(f"❌ Scheduled sync of {sheet_key} failed: {e}")
+                success = False
+            stats["runs"] += 1
+            if success:
+                stats["failureStreak"] = 0
+            else:
+                stats["failures"] += 1
+                stats["failureStreak"] += 1
+                # Unsynced rows stay behind the watermark; schedule another pass for them
+                if stats["failureStreak"] <= SYNC_MAX_FAILURE_RETRIES:
+                    self.dirty[sheet_key] = max(self.dirty.get(sheet_key, 0), 1)
+            stats["lastSyncAt"] = datetime.now().isoformat()
+            stats["lastSyncLatencyMs"] = round((time.monotonic() - self.last_started[sheet_key]) * 1000, 1)
+
+    async def stop(self):
+        """Cancel pending syncs; the watermarks let the next process catch up"""
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        self.tasks = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "windowSeconds": self.window_seconds,
+            "queueDepth": sum(self.dirty.values()),
+            "sheets": {
+                sheet_key: {
+                    **stats,
+                    "pending": self.dirty.get(sheet_key, 0),
+                    "running": sheet_key in self.tasks and not self.tasks[sheet_key].done()
+                }
+                for sheet_key, stats in self.stats_by_sheet.items()
+            }
+        }
+
+# Global instances
+sheets_manager = GoogleSheetsManager()
+sheets_sync_scheduler = SheetsSyncScheduler(sheets_manager) 
\ No newline at end of file
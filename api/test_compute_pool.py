@@ -0,0 +1,126 @@
+"""
+Test the compute pool's saturation, deadline, cancellation and restart paths on a 1-worker pool
+
+Usage: python -m pytest test_compute_pool.py
+"""
+
+import os
+import time
+import asyncio
+import pytest
+from compute_pool import (
+    ComputePool, ComputePoolSaturated, ComputeDeadlineExceeded, ComputeCancelled, checkpoint
+)
+
+# Jobs must be module-level so spawned workers can import them
+
+def spin_job(seconds: float) -> str:
+    """Busy for `seconds`, checkpointing like the real jobs do"""
+    finish_at = time.time() + seconds
+    while time.time() < finish_at:
+        checkpoint()
+        time.sleep(0.01)
+    return "done"
+
+def echo_job(value):
+    return value
+
+def crash_job():
+    os._exit(1)
+
+async def wait_until_idle(pool: ComputePool, timeout: float = 10):
+    """Slots are only freed once the worker is really done with a job"""
+    give_up_at = time.monotonic() + timeout
+    while pool.in_flight and time.monotonic() < give_up_at:
+        await asyncio.sleep(0.01)
+    assert pool.in_flight == 0
+
+def assert_slots_released(pool: ComputePool):
+    assert sorted(pool.free_slots) == list(range(pool.workers + pool.max_queue))
+    assert not any(pool.cancel_flags)
+
+@pytest.fixture
+def pool():
+    pool = ComputePool(workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+def test_saturated_pool_rejects_immediately(pool):
+    async def scenario():
+        await pool.warm()
+        running = [asyncio.ensure_future(pool.run(spin_job, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        started_at = time.monotonic()
+        with pytest.raises(ComputePoolSaturated):
+            await pool.run(echo_job, 1)
+        assert time.monotonic() - started_at < 0.1
+        assert pool.rejected == 1
+
+        assert await asyncio.gather(*running) == ["done", "done"]
+        await wait_until_idle(pool)
+        assert_slots_released(pool)
+
+    asyncio.run(scenario())
+
+def test_deadline_abandons_job(pool):
+    async def scenario():
+        await pool.warm()
+        with pytest.raises(ComputeDeadlineExceeded):
+            await pool.run(spin_job, 30, timeout=0.3)
+        assert pool.timed_out == 1
+
+        # The worker gives up at its next checkpoint instead of spinning for 30s
+        await wait_until_idle(pool, timeout=2)
+        assert_slots_released(pool)
+        assert await pool.run(echo_job, "after deadline") == "after deadline"
+
+    asyncio.run(scenario())
+
+def test_disconnect_cancels_job(pool):
+    async def scenario():
+        await pool.warm()
+        with pytest.raises(ComputeCancelled):
+            await pool.run(spin_job, 30, disconnected=asyncio.sleep(0.2))
+        assert pool.cancelled == 1
+
+        await wait_until_idle(pool, timeout=2)
+        assert_slots_released(pool)
+        assert await pool.run(echo_job, "after disconnect") == "after disconnect"
+
+    asyncio.run(scenario())
+
+def test_slots_and_flags_are_reused(pool):
+    async def scenario():
+        await pool.warm()
+        # More jobs than slots, with cancellations in between, must never run out of slots
+        for attempt in range(pool.workers + pool.max_queue + 3):
+            with pytest.raises(ComputeDeadlineExceeded):
+                await pool.run(spin_job, 30, timeout=0.05)
+            await wait_until_idle(pool, timeout=2)
+            assert await pool.run(echo_job, attempt) == attempt
+        assert_slots_released(pool)
+        assert pool.completed == pool.workers + pool.max_queue + 3
+
+    asyncio.run(scenario())
+
+def test_broken_pool_restarts_once(pool):
+    async def scenario():
+        await pool.warm()
+        broken = pool.executor
+        with pytest.raises(ComputePoolSaturated):
+            await pool.run(crash_job)
+        assert pool.restarts == 1
+        assert pool.executor is None
+
+        assert await pool.run(echo_job, "restarted") == "restarted"
+        # A late failure from the old pool must leave the new one alone
+        replacement = pool.executor
+        pool._restart(broken)
+        assert pool.executor is replacement
+        assert pool.restarts == 1
+
+        await wait_until_idle(pool)
+        assert_slots_released(pool)
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+"""
+Test Google Sheets sync offline against the local fake Sheets API (needs MongoDB, no Google credentials)
+"""
+
+import os
+import asyncio
+import httpx
+
+# Use a throwaway database so real sync watermarks are never touched
+os.environ["DATABASE_NAME"] = "swipr_ai_fake_sheets_test"
+
+from database import get_db, get_waitlist_collection
+from sheets_client import AsyncSheetsClient, SheetsRequestScheduler
+from sheets_integration import GoogleSheetsManager
+from fake_sheets_server import create_app
+
+async def test_sync_fake_sheets():
+    """Rebuild, then sync incrementally, and compare the sheet with MongoDB"""
+    print("🧪 Testing Google Sheets sync against the fake Sheets API...")
+    
+    try:
+        # Fail a fifth of requests to exercise the retry path
+        fake_app = create_app(error_rate=0.2)
+        manager = GoogleSheetsManager()
+        manager.client = AsyncSheetsClient(
+            base_url="http://fake-sheets",
+            scheduler=SheetsRequestScheduler(requests_per_minute=6000, backoff_base=0.01)
+        )
+        manager.client.http = httpx.AsyncClient(
+            base_url="http://fake-sheets",
+            transport=httpx.ASGITransport(app=fake_app)
+        )
+        
+        if not await manager.create_spreadsheet("Fake Sync Test"):
+            print("❌ Failed to create spreadsheet on the fake server")
+            return False
+        
+        waitlist_collection = get_waitlist_collection()
+        if waitlist_collection is None:
+            print("❌ Database not available")
+            return False
+        await waitlist_collection.insert_many([
+            {"email": f"user{i}@example.com", "name": f"User {i}", "interests": ["stocks"], "position": i + 1}
+            for i in range(250)
+        ])
+        
+        print("🔄 Full rebuild...")
+        if not await manager.sync_all_data(incremental=False):
+            print("❌ Full rebuild failed")
+            return False
+        
+        print("🔄 Incremental sync after a new signup...")
+        await waitlist_collection.insert_one({
+            "email": "fake-sheets-test@example.com",
+            "name": "Fake Sheets Test",
+            "interests": [],
+            "position": 0,
+            "joinedAt": "2025-01-01T00:00:00",
+            "status": "test"
+        })
+        if not await manager.sync_waitlist():
+            print("❌ Incremental sync failed")
+            return False
+        
+        expected = await waitlist_collection.count_documents({})
+        result = await manager.client.values_get(manager.spreadsheet_id, "Waitlist!A2:F")
+        rows = result.get("values", [])
+        print(f"📊 MongoDB: {expected} waitlist entries, sheet: {len(rows)} rows")
+        if len(rows) != expected or rows[-1][0] != "fake-sheets-test@example.com":
+            print("❌ Sheet does not match MongoDB")
+            return False
+        
+        print(f"✅ Sheet matches MongoDB ({fake_app.state.sheets.counters['injectedErrors']} injected errors retried)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        return False
+    finally:
+        db = get_db()
+        if db is not None:
+            await db.client.drop_database(db.name)
+
+if __name__ == "__main__":
+    asyncio.run(test_sync_fake_sheets())
@@ -20,6 +20,8 @@ from passlib.context import CryptContext
 import asyncio
 from collections import defaultdict
 
+from market_data import market_data
+
 # Initialize FastAPI app
 app = FastAPI(
     title="swipr.ai API",
@@ -53,18 +55,6 @@ job_applications: Dict[str, Dict] = {}
 stock_data: Dict[str, Dict] = {}
 chat_sessions: Dict[str, Dict] = {}
 
-# Stock data simulation
-STOCK_PRICES = {
-    "AAPL": {"price": 214.46, "change": 0.31, "volume": 52000000, "marketCap": "2.9T"},
-    "TSLA": {"price": 302.28, "change": -30.28, "volume": 41000000, "marketCap": "778B"},
-    "NVDA": {"price": 172.79, "change": 2.01, "volume": 35000000, "marketCap": "1.05T"},
-    "GOOGL": {"price": 141.52, "change": 1.1, "volume": 28000000, "marketCap": "1.57T"},
-    "AMZN": {"price": 142.75, "change": 1.8, "volume": 33000000, "marketCap": "1.48T"},
-    "MSFT": {"price": 414.31, "change": 0.8, "volume": 25000000, "marketCap": "2.71T"},
-    "META": {"price": 315.8, "change": -0.5, "volume": 18000000, "marketCap": "798B"},
-    "SPY": {"price": 445.6, "change": 1.1, "volume": 85000000, "marketCap": "ETF"},
-}
-
 # Pydantic Models
 class UserRegister(BaseModel):
     email: EmailStr
@@ -207,7 +197,7 @@ def generate_portfolio_optimization(risk_level: str, investment_amount: float, p
             "symbol": symbol,
             "allocation": f"{stock_allocation * 100:.1f}",
             "amount": f"{stock_allocation * safe_investment_amount:.2f}",
-            "currentPrice": STOCK_PRICES.get(symbol, {}).get("price", 185.42),
+            "currentPrice": market_data.price(symbol) or 185.42,
             "expectedReturn": f"{(secrets.randbelow(20) + 5):.1f}%",
         })
     
@@ -373,7 +363,7 @@ async def simulate_portfolio(simulation: PortfolioSimulation):
 async def get_stock_prices():
     return {
         "message": "Stock prices retrieved successfully",
-        "data": STOCK_PRICES,
+        "data": market_data.snapshot(),
         "timestamp": get_current_timestamp(),
     }
 
@@ -381,10 +371,10 @@ async def get_stock_prices():
 async def get_stock_data(symbol: str):
     symbol_upper = symbol.upper()
     
-    if symbol_upper not in STOCK_PRICES:
+    stock = market_data.get(symbol_upper)
+    if stock is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     
-    stock = STOCK_PRICES[symbol_upper]
     analysis = {
         **stock,
         "symbol": symbol_upper,
@@ -401,7 +391,8 @@ async def get_stock_data(symbol: str):
 
 @app.post("/api/stocks/swipe")
 async def swipe_stock(swipe: StockSwipe):
-    if swipe.symbol.upper() not in STOCK_PRICES:
+    stock_price = market_data.price(swipe.symbol)
+    if stock_price is None:
         raise HTTPException(status_code=404, detail="Stock not found")
     
     swipe_action = {
@@ -414,8 +405,7 @@ async def swipe_stock(swipe: StockSwipe):
     }
     
     portfolio_update = None
-    if swipe.direction == "right" and swipe.symbol.upper() in STOCK_PRICES:
-        stock_price = STOCK_PRICES[swipe.symbol.upper()]["price"]
+    if swipe.direction == "right":
         portfolio_update = {
             "symbol": swipe.symbol,
             "shares": int(1000 / stock_price),
@@ -0,0 +1,189 @@
+"""
+Columnar in-memory market data: one NumPy array per field, indexed by symbol
+"""
+
+import os
+import csv
+import math
+from typing import Dict, Any, List, Optional, Iterable
+import numpy as np
+
+# Optional CSV with symbol,price,change,volume,marketCap columns
+MARKET_DATA_FILE = os.getenv("MARKET_DATA_FILE")
+
+# Seed universe, updated with current prices
+DEFAULT_UNIVERSE = {
+    "AAPL": {"price": 214.46, "change": 0.31, "volume": 52000000, "marketCap": "2.9T"},
+    "TSLA": {"price": 302.28, "change": -30.28, "volume": 41000000, "marketCap": "778B"},
+    "NVDA": {"price": 172.79, "change": 2.01, "volume": 35000000, "marketCap": "1.05T"},
+    "GOOGL": {"price": 141.52, "change": 1.1, "volume": 28000000, "marketCap": "1.57T"},
+    "AMZN": {"price": 142.75, "change": 1.8, "volume": 33000000, "marketCap": "1.48T"},
+    "MSFT": {"price": 414.31, "change": 0.8, "volume": 25000000, "marketCap": "2.71T"},
+    "META": {"price": 315.8, "change": -0.5, "volume": 18000000, "marketCap": "798B"},
+    "SPY": {"price": 445.6, "change": 1.1, "volume": 85000000, "marketCap": "ETF"},
+}
+
+MARKET_CAP_UNITS = [("T", 1e12), ("B", 1e9), ("M", 1e6), ("K", 1e3)]
+
+def parse_market_cap(value) -> float:
+    """"2.9T" -> 2.9e12; labels such as "ETF" become NaN"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().upper()
+    for suffix, unit in MARKET_CAP_UNITS:
+        if text.endswith(suffix):
+            try:
+                return float(text[:-1]) * unit
+            except ValueError:
+                return math.nan
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+def format_market_cap(value: float, label: str = "") -> str:
+    if math.isnan(value):
+        return label
+    for suffix, unit in MARKET_CAP_UNITS:
+        if value >= unit:
+            return f"{value / unit:.3g}{suffix}"
+    return f"{value:.0f}"
+
+class MarketDataStore:
+    """Prices, changes, volumes and market caps for the whole symbol universe
+
+    Lookups go through a symbol -> row map; tick updates are vectorized over rows.
+    `version` increases on every update so callers can tell when data changed.
+    """
+
+    def __init__(self, records: Dict[str, Dict[str, Any]]):
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.prices = np.empty(0, dtype=np.float64)
+        self.previous_close = np.empty(0, dtype=np.float64)
+        self.volumes = np.empty(0, dtype=np.int64)
+        self.market_caps = np.empty(0, dtype=np.float64)
+        # Non-numeric market caps ("ETF") are kept as display labels
+        self.market_cap_labels: List[str] = []
+        self.version = 0
+        self.add_symbols(records)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "MarketDataStore":
+        with open(path, newline="") as csv_file:
+            records = {
+                row["symbol"].upper(): {
+                    "price": float(row["price"]),
+                    "change": float(row.get("change") or 0),
+                    "volume": int(float(row.get("volume") or 0)),
+                    "marketCap": row.get("marketCap", "")
+                }
+                for row in csv.DictReader(csv_file)
+            }
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self.index
+
+    @property
+    def changes(self) -> np.ndarray:
+        return self.prices - self.previous_close
+
+    def add_symbols(self, records: Dict[str, Dict[str, Any]]):
+        """Append new symbols (existing ones are overwritten in place)"""
+        new_records = {}
+        for symbol, record in records.items():
+            symbol = symbol.upper()
+            if symbol in self.index:
+                row = self.index[symbol]
+                self.prices[row] = record["price"]
+                self.previous_close[row] = record["price"] - record.get("change", 0)
+                self.volumes[row] = record.get("volume", 0)
+                self.market_caps[row] = parse_market_cap(record.get("marketCap", ""))
+                self.market_cap_labels[row] = str(record.get("marketCap", ""))
+            else:
+                new_records[symbol] = record
+
+        if new_records:
+            start = len(self.symbols)
+            for offset, symbol in enumerate(new_records):
+                self.index[symbol] = start + offset
+            self.symbols.extend(new_records)
+            prices = np.fromiter((r["price"] for r in new_records.values()), dtype=np.float64, count=len(new_records))
+            changes = np.fromiter((r.get("change", 0) for r in new_records.values()), dtype=np.float64, count=len(new_records))
+            self.prices = np.concatenate([self.prices, prices])
+            self.previous_close = np.concatenate([self.previous_close, prices - changes])
+            self.volumes = np.concatenate([self.volumes, np.fromiter(
+                (r.get("volume", 0) for r in new_records.values()), dtype=np.int64, count=len(new_records)
+            )])
+            self.market_caps = np.concatenate([self.market_caps, np.fromiter(
+                (parse_market_cap(r.get("marketCap", "")) for r in new_records.values()), dtype=np.float64, count=len(new_records)
+            )])
+            self.market_cap_labels.extend(str(r.get("marketCap", "")) for r in new_records.values())
+        self.version += 1
+
+    def rows(self, symbols: Iterable[str]) -> np.ndarray:
+        """Row numbers for symbols; raises KeyError for unknown ones"""
+        return np.fromiter((self.index[symbol.upper()] for symbol in symbols), dtype=np.intp)
+
+    def price(self, symbol: str) -> Optional[float]:
+        row = self.index.get(symbol.upper())
+        return None if row is None else round(float(self.prices[row]), 2)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        row = self.index.get(symbol.upper())
+        if row is None:
+            return None
+        return {
+            "price": round(float(self.prices[row]), 2),
+            "change": round(float(self.prices[row] - self.previous_close[row]), 2),
+            "volume": int(self.volumes[row]),
+            "marketCap": format_market_cap(float(self.market_caps[row]), self.market_cap_labels[row])
+        }
+
+    def snapshot(self, rows: np.ndarray = None) -> Dict[str, Dict[str, Any]]:
+        """{symbol: {price, change, volume, marketCap}} for all (or the given) rows"""
+        if rows is None:
+            rows = np.arange(len(self.symbols))
+        prices = self.prices[rows].round(2).tolist()
+        changes = (self.prices[rows] - self.previous_close[rows]).round(2).tolist()
+        volumes = self.volumes[rows].tolist()
+        market_caps = self.market_caps[rows].tolist()
+        return {
+            self.symbols[row]: {
+                "price": price,
+                "change": change,
+                "volume": volume,
+                "marketCap": format_market_cap(market_cap, self.market_cap_labels[row])
+            }
+            for row, price, change, volume, market_cap in zip(rows.tolist(), prices, changes, volumes, market_caps)
+        }
+
+    def apply_ticks(self, rows: np.ndarray, prices: np.ndarray, volumes: np.ndarray = None):
+        """Set new last prices (and add traded volume) for many rows at once"""
+        self.prices[rows] = prices
+        if volumes is not None:
+            np.add.at(self.volumes, rows, volumes)
+        self.version += 1
+
+    def update_prices(self, updates: Dict[str, float]):
+        """Convenience wrapper around apply_ticks for {symbol: price}"""
+        self.apply_ticks(self.rows(updates), np.fromiter(updates.values(), dtype=np.float64, count=len(updates)))
+
+    def roll_session(self):
+        """Start a new trading session: today's last prices become the previous close"""
+        self.previous_close = self.prices.copy()
+        self.version += 1
+
+def load_market_data() -> MarketDataStore:
+    if MARKET_DATA_FILE:
+        store = MarketDataStore.from_csv(MARKET_DATA_FILE)
+        print(f"📈 Loaded {len(store)} symbols from {MARKET_DATA_FILE}")
+        return store
+    return MarketDataStore(DEFAULT_UNIVERSE)
+
+# Global instance
+market_data = load_market_data()